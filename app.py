@@ -1,86 +1,285 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from typing import Optional
 from fastapi import FastAPI, UploadFile, File, Form
 from fastapi.responses import JSONResponse
-import pytesseract
-import cv2
 import numpy as np
-import re
-from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
+from starlette.concurrency import run_in_threadpool
+import os
 import earnings_dates
+from scheduler import PrewarmScheduler
+from jobs import JobQueue, JobQueueFull, bytes_hash, dates_hash
+from ocr_engines import OCREngineUnavailable, get_ocr_engine, ocr_engine_name
+from price_providers import price_provider_name
+from distribution import distributions, parse_bins, parse_value_range
+from event_study import BENCHMARK_SYMBOL, ESTIMATION_WINDOW, event_studies
+from rolling_stats import DEFAULT_HALFLIFE, DEFAULT_WINDOW, MoveBands, sigma_bands
+from screen import (SCREEN_BASELINES, expected_announcement, parse_announcements, parse_date, parse_implied_moves,
+                    rank_rows, screen_row)
+from uploads import BodySizeLimitMiddleware, InvalidImage, UploadTooLarge, read_uploads
 
 from earnings_reaction_calculator import price_changes_for_dates
 
-app = FastAPI()
+app = FastAPI(title="NSE Earnings Analytics API")
+
+# Refuse oversized request bodies while they stream in. Added before CORS so
+# CORS wraps it and the dashboard can read the 413
+app.add_middleware(BodySizeLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
-'''allow_origins=[
-        "http://localhost:8080",
-        "http://127.0.0.1:8080",
-        # "https://your-production-domain.com"
-    ],
-    allow_origins=["http://localhost:8080", "http://127.0.0.1:8080", "https://nse-earnings-dashboard-combined.vercel.app", "*"]''',
+    # allow_origins=[
+    #     "http://localhost:8080",
+    #     "http://127.0.0.1:8080",
+    #     # "https://your-production-domain.com"
+    # ],
+    # allow_origins=["http://localhost:8080", "http://127.0.0.1:8080", "https://nse-earnings-dashboard-combined.vercel.app", "*"],
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=413)
+
+
+@app.exception_handler(InvalidImage)
+async def invalid_image(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+
+@app.exception_handler(OCREngineUnavailable)
+async def ocr_engine_unavailable(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=503)
+
+
+@app.exception_handler(JobQueueFull)
+async def job_queue_full(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=503, headers={"Retry-After": "5"})
+
 def get_stored_dates_for_ticker(ticker: str):
     ticker_upper = ticker.upper()
     return getattr(earnings_dates, ticker_upper, None)
 
 
-def extract_dates_times_from_text(text):
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    dates = []
-    times = []
-    date_pattern = r"\d{1,2} [A-Za-z]{3} \d{4}"
-    time_pattern = r"\d{2}:\d{2}"
-    for line in lines:
-        if re.match(date_pattern, line):
-            dates.append(line)
-        elif re.match(time_pattern, line):
-            times.append(line)
-    dates_with_times = []
-    for dt, tm in zip(dates, times):
-        try:
-            dt_obj = datetime.strptime(dt, "%d %b %Y")
-            date_formatted = dt_obj.strftime("%Y-%m-%d")
-            dates_with_times.append((date_formatted, tm))
-        except ValueError:
-            continue
-    return dates_with_times
+# "layout" pairs dates with times using word boxes; "text" runs the text
+# parser over the engine's plain output
+OCR_MODES = ("layout", "text")
+
+
+def check_request_options(ocr_mode, ocr_engine=None, price_provider=None):
+    """Error message for an unsupported mode, engine or provider, else None."""
+    if ocr_mode not in OCR_MODES:
+        return f"ocr_mode must be one of {', '.join(OCR_MODES)}."
+    try:
+        ocr_engine_name(ocr_engine)
+        price_provider_name(price_provider)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def ocr_dates_from_images(image_contents, ocr_mode="layout", ocr_engine=None):
+    engine = get_ocr_engine(ocr_engine)
+    all_dates_with_times = []
+    for contents in image_contents:
+        all_dates_with_times.extend(engine.extract(contents, ocr_mode))
+    return all_dates_with_times
+
+
+def abs_move_stats(changes):
+    """Absolute mean and mean + 1/2/3 sigma of absolute % moves (None entries skipped)."""
+    abs_changes = [abs(change) for change in changes if change is not None]
+    if not abs_changes:
+        return {"absolute_mean": None, "first_std": None, "second_std": None, "third_std": None}
+    mean, std = np.mean(abs_changes), np.std(abs_changes)
+    return {
+        "absolute_mean": round(float(mean), 2),
+        "first_std": round(float(mean + std), 2),
+        "second_std": round(float(mean + 2 * std), 2),
+        "third_std": round(float(mean + 3 * std), 2),
+    }
+
+
+def check_band_options(band_window, band_halflife):
+    """Error message for invalid rolling/EWMA band settings, else None."""
+    try:
+        MoveBands(band_window, band_halflife)
+    except ValueError as e:
+        return f"Invalid sigma bands: {e}"
+    return None
+
+
+def build_analysis(ticker, all_dates_with_times, progress=None, price_provider=None, benchmark=None,
+                   band_window=DEFAULT_WINDOW, band_halflife=DEFAULT_HALFLIFE):
+    """Reaction moves and stats; with a `benchmark`, also market-adjusted (abnormal) moves against it.
+
+    Stats carry full-history sigma bands plus rolling (last `band_window`
+    results) and EWMA (`band_halflife`) ones.
+    """
+    all_dates_with_times = sorted(all_dates_with_times, key=lambda pair: (pair[0], pair[1] or ""))
+    study = None
+    if benchmark:
+        # Runs first: its estimation windows need the longer history, which
+        # then also covers the calculator's windows from the price cache
+        study = event_studies({ticker: all_dates_with_times}, benchmark=benchmark, provider=price_provider)[ticker]
+    results = price_changes_for_dates(ticker, all_dates_with_times, progress=progress, provider=price_provider)
+    output_results = []
+    for date, change, open_p, high_p, low_p, close_p in results:
+        output_results.append({
+            "date": date,
+            "price_change_pct": change,
+            "open": open_p,
+            "high": high_p,
+            "low": low_p,
+            "close": close_p
+        })
+    analysis = {"results": output_results}
+    if study is not None:
+        # Both lists follow the sorted input, one row per date
+        for row, study_row in zip(output_results, study):
+            row.update({k: v for k, v in study_row.items() if k != "date"})
+    series = move_series(analysis)
+    dists = distributions(series)
+    bands = sigma_bands(series, window=band_window, halflife=band_halflife)
+    analysis["stats"] = {"total_input_dates": len(all_dates_with_times),
+                         **abs_move_stats(series["moves"]), **bands["moves"]}
+    analysis["distribution"] = dists["moves"]
+    if study is not None:
+        analysis["event_study"] = {
+            "benchmark": benchmark,
+            "estimation_window": ESTIMATION_WINDOW,
+            "stats": {**abs_move_stats(series["abnormal"]), **bands["abnormal"]},
+            "distribution": dists["abnormal"]
+        }
+    return analysis
+
+
+def move_series(analysis):
+    """Raw % moves, plus abnormal ones for event-study analyses, keyed for the batch stats functions."""
+    series = {"moves": [row["price_change_pct"] for row in analysis["results"]]}
+    if analysis["results"] and "abnormal_change_pct" in analysis["results"][0]:
+        series["abnormal"] = [row["abnormal_change_pct"] for row in analysis["results"]]
+    return series
+
+
+def with_distribution(analysis, bins):
+    # build_analysis already carries the auto-binned distribution
+    if bins == "auto":
+        return analysis
+    dists = distributions(move_series(analysis), bins=bins)
+    rebinned = {**analysis, "distribution": dists["moves"]}
+    if "event_study" in analysis:
+        rebinned["event_study"] = {**analysis["event_study"], "distribution": dists["abnormal"]}
+    return rebinned
+
+
+def with_sigma_bands(analysis, band_window, band_halflife):
+    # build_analysis already carries the default bands
+    if (band_window, band_halflife) == (analysis["stats"]["rolling"]["window"], analysis["stats"]["ewma"]["halflife"]):
+        return analysis
+    bands = sigma_bands(move_series(analysis), window=band_window, halflife=band_halflife)
+    updated = {**analysis, "stats": {**analysis["stats"], **bands["moves"]}}
+    if "event_study" in analysis:
+        updated["event_study"] = {**analysis["event_study"],
+                                  "stats": {**analysis["event_study"]["stats"], **bands["abnormal"]}}
+    return updated
+
+
+NO_DATES_ERROR = "No uploaded images and no stored earnings dates found for this ticker."
+
+
+def run_analysis_job(progress, ticker, image_contents, stored_dates, ocr_mode="layout", ocr_engine=None,
+                     price_provider=None, benchmark=None, band_window=DEFAULT_WINDOW, band_halflife=DEFAULT_HALFLIFE):
+    # OCR happens inside the job so large uploads never block the request
+    all_dates_with_times = ocr_dates_from_images(image_contents, ocr_mode, ocr_engine) if image_contents else []
+    if not all_dates_with_times:
+        all_dates_with_times = stored_dates or []
+    if not all_dates_with_times:
+        raise ValueError(NO_DATES_ERROR)
+    return build_analysis(ticker, all_dates_with_times, progress=progress, price_provider=price_provider,
+                          benchmark=benchmark, band_window=band_window, band_halflife=band_halflife)
+
+
+job_queue = JobQueue(max_workers=2)
+
+# Analyses of stored tickers, kept current by the pre-warm scheduler
+stored_analyses = {}
+
+
+def recompute_stored_analysis(ticker):
+    stored_dates = get_stored_dates_for_ticker(ticker)
+    if stored_dates:
+        stored_analyses[ticker.upper()] = build_analysis(ticker, stored_dates)
+
+
+def analyze_stored_ticker(ticker, price_provider=None, benchmark=None):
+    # The scheduler only keeps plain analyses from the configured default provider
+    if benchmark is None and price_provider_name(price_provider) == price_provider_name():
+        cached = stored_analyses.get(ticker.upper())
+        if cached is not None:
+            return cached
+    return build_analysis(ticker, get_stored_dates_for_ticker(ticker), price_provider=price_provider,
+                          benchmark=benchmark)
+
+
+prewarm_scheduler = PrewarmScheduler(recompute=recompute_stored_analysis)
+
+
+@app.on_event("startup")
+async def start_prewarm_scheduler():
+    # Set PREWARM_PRICES=0 to disable, e.g. for offline runs
+    if os.environ.get("PREWARM_PRICES", "1") != "0":
+        prewarm_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_prewarm_scheduler():
+    prewarm_scheduler.stop()
+
 
 @app.post("/analyze")
 async def analyze(
     ticker: str = Form(...),
-    images: Optional[List[UploadFile]] = File(None)
+    images: Optional[List[UploadFile]] = File(None),
+    ocr_mode: str = Form("layout"),
+    bins: str = Form("auto"),
+    ocr_engine: Optional[str] = Form(None),
+    price_provider: Optional[str] = Form(None),
+    event_study: bool = Form(False),
+    benchmark: str = Form(BENCHMARK_SYMBOL),
+    band_window: int = Form(DEFAULT_WINDOW),
+    band_halflife: float = Form(DEFAULT_HALFLIFE)
 ):
+    error = check_request_options(ocr_mode, ocr_engine, price_provider) or check_band_options(band_window, band_halflife)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    try:
+        bins = parse_bins(bins)
+    except ValueError as e:
+        return JSONResponse({"error": f"Invalid bins: {e}"}, status_code=400)
+    # OCR and price work block, so they run in the threadpool to keep the
+    # event loop free for other requests
     all_dates_with_times = []
     if images:
-        for image in images:
-            contents = await image.read()
-            npimg = np.frombuffer(contents, np.uint8)
-            img = cv2.imdecode(npimg, cv2.IMREAD_COLOR)
-            ocr_text = pytesseract.image_to_string(img)
-            dates_with_times = extract_dates_times_from_text(ocr_text)
-            all_dates_with_times.extend(dates_with_times)
+        image_contents = await read_uploads(images)
+        all_dates_with_times = await run_in_threadpool(ocr_dates_from_images, image_contents, ocr_mode, ocr_engine)
     else:
     # Handle case with no uploaded images (e.g. use stored dates)
         stored_dates = get_stored_dates_for_ticker(ticker)
         if stored_dates:
-            all_dates_with_times = stored_dates
+            analysis = await run_in_threadpool(analyze_stored_ticker, ticker, price_provider,
+                                               benchmark if event_study else None)
+            return JSONResponse(with_sigma_bands(with_distribution(analysis, bins), band_window, band_halflife))
         else:
             return JSONResponse(
-                {"error": "No uploaded images and no stored earnings dates found for this ticker."},
+                {"error": NO_DATES_ERROR},
                 status_code=400,
             )
-    # Sort by date (and time if needed)
-    all_dates_with_times.sort()
     if not all_dates_with_times:
         # Try fetching stored dates
         stored_dates = get_stored_dates_for_ticker(ticker)
@@ -88,38 +287,181 @@ async def analyze(
             all_dates_with_times = stored_dates
         else:
             return JSONResponse(
-                {"error": "No uploaded images and no stored earnings dates found for this ticker."},
+                {"error": NO_DATES_ERROR},
                 status_code=400
             )
-    all_dates_with_times.sort()
-    results = price_changes_for_dates(ticker, all_dates_with_times)
-    output_results = []
-    valid_changes = []
-    for date, change, open_p, high_p, low_p, close_p in results:
-        output_results.append({
-            "date": date,
-            "price_change_pct": change,
-            "open": open_p,
-            "high": high_p,
-            "low": low_p,
-            "close": close_p
-        })
-        if change is not None:
-            valid_changes.append(abs(change))
-    stats = {}
-    if valid_changes:
-        stats["total_input_dates"] = len(all_dates_with_times)
-        stats["absolute_mean"] = round(np.mean(valid_changes), 2)
-        stats["first_std"] = round(np.mean(valid_changes) + np.std(valid_changes), 2)
-        stats["second_std"] = round(np.mean(valid_changes) + 2 * np.std(valid_changes), 2)
-        stats["third_std"] = round(np.mean(valid_changes) + 3 * np.std(valid_changes), 2)
+    analysis = await run_in_threadpool(build_analysis, ticker, all_dates_with_times, price_provider=price_provider,
+                                       benchmark=benchmark if event_study else None,
+                                       band_window=band_window, band_halflife=band_halflife)
+    return JSONResponse(with_distribution(analysis, bins))
+
+
+@app.get("/distributions")
+async def get_distributions(tickers: str = "", bins: str = "auto", range_min: Optional[float] = None,
+                            range_max: Optional[float] = None, event_study: bool = False,
+                            benchmark: str = BENCHMARK_SYMBOL, band_window: int = DEFAULT_WINDOW,
+                            band_halflife: float = DEFAULT_HALFLIFE):
+    """Ready-to-plot move distributions for several stored tickers (comma-separated; default all).
+
+    With event_study=true the distributions are of abnormal moves against
+    `benchmark`, which is loaded once for all the tickers. Each ticker also
+    gets its current rolling and EWMA sigma bands.
+    """
+    error = check_band_options(band_window, band_halflife)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    try:
+        bins = parse_bins(bins)
+    except ValueError as e:
+        return JSONResponse({"error": f"Invalid bins: {e}"}, status_code=400)
+    try:
+        value_range = parse_value_range(range_min, range_max)
+    except ValueError as e:
+        return JSONResponse({"error": f"Invalid range: {e}"}, status_code=400)
+    names = [t.strip().upper() for t in tickers.split(",") if t.strip()] or earnings_dates.stored_tickers()
+    unknown = [t for t in names if not get_stored_dates_for_ticker(t)]
+    if unknown:
+        return JSONResponse({"error": f"No stored earnings dates for: {', '.join(unknown)}"}, status_code=400)
+    if event_study:
+        # Chronological, so the rolling bands see events in order
+        studies = event_studies({
+            t: sorted(get_stored_dates_for_ticker(t), key=lambda pair: (pair[0], pair[1] or "")) for t in names
+        }, benchmark=benchmark)
+        moves_by_ticker = {t: [row["abnormal_change_pct"] for row in studies[t]] for t in names}
+    else:
+        moves_by_ticker = {
+            t: [row["price_change_pct"] for row in analyze_stored_ticker(t)["results"]] for t in names
+        }
+    result = distributions(moves_by_ticker, bins=bins, value_range=value_range)
+    bands = sigma_bands(moves_by_ticker, window=band_window, halflife=band_halflife)
+    for t in names:
+        result[t]["sigma_bands"] = bands[t]
+    return JSONResponse(result)
+
+
+# Tickers analysed concurrently by /screen; cached prices make most of them instant
+SCREEN_WORKERS = 8
+
+
+def screen_analyses(tickers, price_provider=None):
+    with ThreadPoolExecutor(max_workers=SCREEN_WORKERS) as pool:
+        analyses = pool.map(lambda ticker: analyze_stored_ticker(ticker, price_provider), tickers)
+        return dict(zip(tickers, analyses))
+
+
+@app.post("/screen")
+async def screen_upcoming_results(
+    start: str = Form(...),
+    end: str = Form(...),
+    implied_moves: str = Form(""),
+    announcements: str = Form(""),
+    tickers: str = Form(""),
+    baseline: str = Form("full"),
+    price_provider: Optional[str] = Form(None)
+):
+    """Rank stored tickers reporting between `start` and `end` by implied vs historical move.
+
+    Dates are estimated from each ticker's stored reporting cycle unless
+    given in `announcements` ("TCS:2025-10-09 16:30,INFY:2025-10-16").
+    `implied_moves` ("TCS:4.5,INFY:3.2") are the absolute % moves the
+    options price in, compared against the `baseline` historical mean
+    (full history, rolling or EWMA).
+    """
+    if baseline not in SCREEN_BASELINES:
+        return JSONResponse({"error": f"baseline must be one of {', '.join(SCREEN_BASELINES)}."}, status_code=400)
+    error = check_request_options("layout", price_provider=price_provider)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    try:
+        start_date, end_date = parse_date(start), parse_date(end)
+        implied = parse_implied_moves(implied_moves)
+        announced = parse_announcements(announcements)
+    except ValueError as e:
+        return JSONResponse({"error": f"Invalid screen request: {e}"}, status_code=400)
+    if end_date < start_date:
+        return JSONResponse({"error": "end must not be before start."}, status_code=400)
+    universe = [t.strip().upper() for t in tickers.split(",") if t.strip()] or earnings_dates.stored_tickers()
+    unknown = [t for t in set(universe) | set(announced) | set(implied) if not get_stored_dates_for_ticker(t)]
+    if unknown:
+        return JSONResponse({"error": f"No stored earnings dates for: {', '.join(sorted(unknown))}"}, status_code=400)
+
+    calendar = {}
+    for ticker in universe:
+        if ticker in announced:
+            date, time = announced[ticker]
+            if start_date <= parse_date(date) <= end_date:
+                calendar[ticker] = (date, time, "announced")
+        else:
+            expected = expected_announcement(get_stored_dates_for_ticker(ticker), start_date, end_date)
+            if expected is not None:
+                calendar[ticker] = (*expected, "estimated")
+    for ticker, (date, time) in announced.items():
+        # Announced tickers outside the universe list are still screened
+        if ticker not in calendar and start_date <= parse_date(date) <= end_date:
+            calendar[ticker] = (date, time, "announced")
+
+    analyses = await run_in_threadpool(screen_analyses, list(calendar), price_provider)
+    rows = [
+        screen_row(ticker, date, time, source, analyses[ticker], implied.get(ticker), baseline)
+        for ticker, (date, time, source) in calendar.items()
+    ]
+    return JSONResponse({"start": start, "end": end, "baseline": baseline, "rows": rank_rows(rows)})
+
+
+@app.post("/jobs", status_code=202)
+async def submit_analysis_job(
+    ticker: str = Form(...),
+    images: Optional[List[UploadFile]] = File(None),
+    ocr_mode: str = Form("layout"),
+    ocr_engine: Optional[str] = Form(None),
+    price_provider: Optional[str] = Form(None),
+    event_study: bool = Form(False),
+    benchmark: str = Form(BENCHMARK_SYMBOL),
+    band_window: int = Form(DEFAULT_WINDOW),
+    band_halflife: float = Form(DEFAULT_HALFLIFE)
+):
+    """Queue an analysis and return its job id; poll GET /jobs/{job_id} for the result."""
+    error = check_request_options(ocr_mode, ocr_engine, price_provider) or check_band_options(band_window, band_halflife)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    image_contents = await read_uploads(images) if images else []
+    stored_dates = get_stored_dates_for_ticker(ticker)
+    if not image_contents and not stored_dates:
+        return JSONResponse({"error": NO_DATES_ERROR}, status_code=400)
+    # Dedupe on (ticker, dates): the dates hash for stored tickers, or the
+    # upload digest when the dates are still locked inside the screenshots
+    if image_contents:
+        # Build the engine now so a missing OCR stack is a 503 here, not a failed job later
+        await run_in_threadpool(get_ocr_engine, ocr_engine)
+        source_hash = f"{ocr_engine_name(ocr_engine)}:{ocr_mode}:{bytes_hash(image_contents)}"
     else:
-        stats["total_input_dates"] = len(all_dates_with_times)
-        stats["absolute_mean"] = None
-        stats["first_std"] = None
-        stats["second_std"] = None
-        stats["third_std"] = None
+        source_hash = dates_hash(stored_dates)
+    benchmark = benchmark if event_study else None
+    job, deduplicated = job_queue.submit(
+        (ticker.upper(), price_provider_name(price_provider), benchmark, band_window, band_halflife, source_hash),
+        run_analysis_job, ticker, image_contents, stored_dates, ocr_mode, ocr_engine, price_provider, benchmark,
+        band_window, band_halflife
+    )
     return JSONResponse({
-        "results": output_results,
-        "stats": stats
-    })
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "deduplicated": deduplicated
+    }, status_code=202)
+
+
+@app.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown or expired job id."}, status_code=404)
+    return JSONResponse(job)
+
+
+@app.get("/health")
+async def health_check():
+    return {
+        "status": "healthy",
+        "service": "NSE Earnings Analytics API",
+        "ocr_engine": ocr_engine_name(),
+        "price_provider": price_provider_name()
+    }
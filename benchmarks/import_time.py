@@ -0,0 +1,79 @@
+"""Import-time budget check for the API service.
+
+Imports `app` in a fresh interpreter under -X importtime and fails (exit 1)
+if the cold import takes longer than the budget, or if it pulls in a heavy
+module that should only load on first use. Run from the repo root:
+
+    python -m benchmarks.import_time --budget-ms 1000
+
+tests/test_import_time.py runs the same check under pytest.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Loaded on demand by the OCR engines, price providers and calculator;
+# none of them should be needed just to start the API
+DEFERRED_MODULES = ("pandas", "matplotlib", "yfinance", "cv2", "pytesseract", "easyocr", "PIL", "torch")
+DEFAULT_BUDGET_MS = 1000.0
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_import(module):
+    """[(self_us, cumulative_us, name)] for one cold import of `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=REPO_ROOT,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def check_import(module="app", budget_ms=DEFAULT_BUDGET_MS, runs=3):
+    """(best cumulative us, rows of that run, failure messages) over `runs` cold imports."""
+    best = None
+    for _ in range(runs):
+        rows = profile_import(module)
+        total_us = next(cum for _, cum, name in rows if name == module)
+        if best is None or total_us < best[0]:
+            best = (total_us, rows)
+    total_us, rows = best
+
+    failures = []
+    if total_us / 1000 > budget_ms:
+        failures.append(f"import took {total_us / 1000:.0f} ms, over the {budget_ms:.0f} ms budget")
+    loaded = {name.split(".")[0] for _, _, name in rows}
+    eager = [m for m in DEFERRED_MODULES if m in loaded]
+    if eager:
+        failures.append(f"imported at startup but should load lazily: {', '.join(eager)}")
+    return total_us, rows, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="best of N runs, to ride out disk-cache noise")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    total_us, rows, failures = check_import(args.module, args.budget_ms, args.runs)
+
+    print(f"import {args.module}: {total_us / 1000:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print("slowest modules by self time:")
+    for self_us, cumulative_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:7.1f} ms  (cumulative {cumulative_us / 1000:7.1f} ms)  {name}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
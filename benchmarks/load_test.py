@@ -0,0 +1,203 @@
+"""Load test for POST /analyze across concurrency levels.
+
+Drives the app in-process through httpx's ASGI transport (default) or a
+running server with --url, cycling through the stored tickers in
+earnings_dates. Prices come from the offline synthetic provider unless
+--price-provider says otherwise, so runs are repeatable and never touch
+the network. A share of requests can carry screenshots to include OCR.
+Reports throughput, p50/p95/p99 latency and peak RSS per worker process
+for each level. Run from the repo root:
+
+    python -m benchmarks.load_test --concurrency 1,4,16 --requests 200
+    python -m benchmarks.load_test --images sample_input.png --image-share 0.25
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --pid 4242 --pid 4243
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+import httpx
+import numpy as np
+
+import earnings_dates
+
+
+def rss_mb(pid=None):
+    """Resident set size of `pid` (default this process) in MB."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid is None:
+        # No /proc (macOS): fall back to the peak, reported in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+    return float("nan")
+
+
+class RSSSampler:
+    """Samples the RSS of each worker in a background thread and keeps the peak."""
+
+    def __init__(self, pids, interval=0.05):
+        self.pids = pids
+        self.interval = interval
+        self.peak = {pid: rss_mb(pid) for pid in pids}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for pid in self.pids:
+                self.peak[pid] = max(self.peak[pid], rss_mb(pid))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def build_requests(tickers, images, image_share, price_provider, ocr_engine, count):
+    """(form data, files) for `count` requests, tickers round-robin and images spread evenly."""
+    requests = []
+    with_images = 0
+    for i in range(count):
+        data = {"ticker": tickers[i % len(tickers)], "price_provider": price_provider}
+        files = None
+        # Spread image requests evenly instead of bunching them at the start
+        if images and (i + 1) * image_share >= with_images + 1:
+            name, contents = images[with_images % len(images)]
+            files = [("images", (name, contents, "application/octet-stream"))]
+            if ocr_engine:
+                data["ocr_engine"] = ocr_engine
+            with_images += 1
+        requests.append((data, files))
+    return requests
+
+
+async def run_level(client, requests, concurrency):
+    """Send `requests` with `concurrency` in flight; returns (latencies_s, status counts, wall_s)."""
+    latencies = []
+    statuses = {}
+    queue = iter(requests)
+
+    async def worker():
+        for data, files in queue:
+            t0 = time.perf_counter()
+            try:
+                response = await client.post("/analyze", data=data, files=files)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - t0
+
+
+def make_client(url, timeout):
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+    # No lifespan events over the ASGI transport, so the prewarm scheduler stays off;
+    # unhandled errors come back as 500s, as they would from a server
+    from app import app
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout)
+
+
+async def run(args, tickers, images, pids):
+    rows = []
+    async with make_client(args.url, args.timeout) as client:
+        if args.warmup:
+            # One pass over the tickers fills the price cache; the levels then measure steady state
+            warmup = build_requests(tickers, [], 0, args.price_provider, None, len(tickers))
+            await run_level(client, warmup, min(len(tickers), max(args.concurrency)))
+        for concurrency in args.concurrency:
+            requests = build_requests(tickers, images, args.image_share, args.price_provider,
+                                      args.ocr_engine, args.requests)
+            with RSSSampler(pids) as sampler:
+                latencies, statuses, wall = await run_level(client, requests, concurrency)
+            ms = np.array(latencies) * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            rows.append({
+                "concurrency": concurrency,
+                "requests": len(latencies),
+                "errors": sum(n for status, n in statuses.items() if status != 200),
+                "statuses": {str(status): n for status, n in statuses.items()},
+                "throughput_rps": len(latencies) / wall,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "peak_rss_mb": {str(pid or os.getpid()): sampler.peak[pid] for pid in pids},
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server; default drives the app in-process")
+    parser.add_argument("--pid", type=int, action="append", default=[],
+                        help="server worker PID to sample RSS from (repeatable; with --url)")
+    parser.add_argument("--concurrency", default="1,4,16",
+                        type=lambda s: [int(c) for c in s.split(",")])
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--tickers", help="comma-separated stored tickers; default all")
+    parser.add_argument("--images", nargs="*", default=[], help="screenshots to upload with some requests")
+    parser.add_argument("--image-share", type=float, default=0.0, help="fraction of requests with images")
+    parser.add_argument("--ocr-engine")
+    parser.add_argument("--price-provider", default="synthetic")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-p95-ms", type=float, help="exit 1 if any level's p95 exceeds this")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.images and args.image_share == 0:
+        args.image_share = 1.0
+    tickers = [t.strip().upper() for t in args.tickers.split(",")] if args.tickers else earnings_dates.stored_tickers()
+    images = []
+    for path in args.images:
+        with open(path, "rb") as f:
+            images.append((os.path.basename(path), f.read()))
+    # In-process, the one worker is this process
+    pids = args.pid if args.url else [None]
+
+    rows = asyncio.run(run(args, tickers, images, pids))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        target = args.url or "in-process"
+        print(f"POST /analyze  {target}  provider={args.price_provider}  tickers={len(tickers)}  "
+              f"image share={args.image_share if images else 0:.0%}")
+        print(f"{'conc':>5s} {'reqs':>6s} {'errors':>6s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} "
+              f"{'p99 ms':>8s}  peak RSS MB per worker")
+        for row in rows:
+            rss = "  ".join(f"{pid}:{mb:.0f}" for pid, mb in row["peak_rss_mb"].items()) or "-"
+            print(f"{row['concurrency']:5d} {row['requests']:6d} {row['errors']:6d} {row['throughput_rps']:8.1f} "
+                  f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f}  {rss}")
+        for row in rows:
+            failed = {s: n for s, n in row["statuses"].items() if s != "200"}
+            if failed:
+                print(f"concurrency {row['concurrency']}: non-200 responses {failed}")
+
+    if args.max_p95_ms is not None:
+        slow = [row["concurrency"] for row in rows if row["p95_ms"] > args.max_p95_ms]
+        if slow:
+            print(f"FAIL: p95 over {args.max_p95_ms:.0f} ms at concurrency {', '.join(map(str, slow))}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
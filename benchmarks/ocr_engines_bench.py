@@ -0,0 +1,43 @@
+"""Compare the registered OCR engines on the same screenshots.
+
+Run from the repo root (engines whose libraries aren't installed are skipped):
+
+    python -m benchmarks.ocr_engines_bench sample_input.png --mode layout
+"""
+import argparse
+import time
+
+from ocr_engines import OCR_ENGINES, OCREngineUnavailable, get_ocr_engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--mode", choices=("layout", "text"), default="layout")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    contents = []
+    for path in args.images:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+
+    for name in sorted(OCR_ENGINES):
+        try:
+            t0 = time.perf_counter()
+            engine = get_ocr_engine(name)
+            load = time.perf_counter() - t0
+        except OCREngineUnavailable as e:
+            print(f"{name:10s} skipped ({e})")
+            continue
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            pairs = [pair for c in contents for pair in engine.extract(c, args.mode)]
+            best = min(best, time.perf_counter() - t0)
+        with_time = sum(1 for _, t in pairs if t is not None)
+        print(f"{name:10s} load {load:6.2f}s  best {best:6.2f}s  {len(pairs)} dates ({with_time} with time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Throughput benchmark for ocr_parser over large synthetic OCR dumps.
+
+Run from the repo root:
+
+    python -m benchmarks.ocr_parser_bench --events 200000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from ocr_parser import parse_events
+
+_NOISE = ["Board Meeting", "Financial Results", "Q1 FY26", "Outcome of", "NSE", "Rs 1,234.50", "Consolidated"]
+
+
+def make_dump(n_events, seed=0):
+    """OCR-like text mixing every supported layout, row and column style."""
+    rng = random.Random(seed)
+    start = date(2005, 1, 1)
+    parts = []
+    i = 0
+    while i < n_events:
+        block = rng.randint(1, 6)
+        days = [start + timedelta(days=rng.randint(0, 7000)) for _ in range(block)]
+        times = [f"{rng.randint(9, 23):02d}:{rng.randint(0, 59):02d}" for _ in range(block)]
+        layout = rng.randrange(5)
+        if layout == 0:
+            parts.extend(f"{d:%d %b %Y} {t}" for d, t in zip(days, times))
+        elif layout == 1:
+            for d, t in zip(days, times):
+                parts.extend([f"{d:%d %b %Y}", t])
+        elif layout == 2:
+            parts.extend(f"{d:%d %b %Y}" for d in days)
+            parts.extend(times)
+        elif layout == 3:
+            parts.extend(f"{d:%b %d, %Y} at {t}" for d, t in zip(days, times))
+        else:
+            parts.extend(f"{d:%d/%m/%Y} {t}" if k % 2 else f"{d.isoformat()} {t}" for k, (d, t) in enumerate(zip(days, times)))
+        parts.append(rng.choice(_NOISE))
+        i += block
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = make_dump(args.events)
+    size_mb = len(text.encode()) / 1e6
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        events = parse_events(text)
+        best = min(best, time.perf_counter() - t0)
+    paired = sum(1 for e in events if e["time"] is not None)
+    print(f"dump: {size_mb:.1f} MB, {len(events)} events parsed ({paired} with time)")
+    print(f"best of {args.repeat}: {best:.3f}s  ->  {size_mb / best:.1f} MB/s, {len(events) / best:,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import warnings
+
+import numpy as np
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Absolute moves, in %, whose exceedance probability is reported
+DEFAULT_TAIL_THRESHOLDS = (2, 4, 6, 8, 10)
+# Upper bound on bin count so a single outlier can't explode the histogram
+MAX_BINS = 60
+
+
+def _auto_bin_counts(matrix, counts, lo, hi):
+    """Freedman-Diaconis bin counts per row, falling back to Sturges when the IQR is zero."""
+    q25, q75 = np.nanquantile(matrix, [0.25, 0.75], axis=1)
+    iqr = q75 - q25
+    with np.errstate(divide="ignore", invalid="ignore"):
+        width = 2 * iqr / np.cbrt(counts)
+        fd_bins = np.ceil((hi - lo) / width)
+    sturges = np.ceil(np.log2(np.maximum(counts, 1))) + 1
+    bins = np.where(np.isfinite(fd_bins) & (fd_bins > 0), fd_bins, sturges)
+    return np.clip(bins, 1, MAX_BINS).astype(int)
+
+
+def distributions(moves_by_ticker, bins="auto", value_range=None,
+                  quantiles=DEFAULT_QUANTILES, tail_thresholds=DEFAULT_TAIL_THRESHOLDS):
+    """Histogram, quantiles and tail probabilities for many tickers in one vectorized pass.
+
+    `moves_by_ticker` maps ticker -> sequence of % moves (None entries are
+    skipped). `bins` is "auto" (Freedman-Diaconis per ticker), a bin count,
+    or an explicit sequence of edges shared by every ticker. When
+    `value_range` or explicit edges leave moves outside the plotted range,
+    they are counted in underflow/overflow buckets instead of being dropped.
+    """
+    tickers = list(moves_by_ticker)
+    rows = [np.array([m for m in moves_by_ticker[t] if m is not None], dtype=float) for t in tickers]
+    counts = np.array([len(r) for r in rows])
+    n_rows, width = len(rows), max(counts.max(initial=0), 1)
+    matrix = np.full((n_rows, width), np.nan)
+    for i, r in enumerate(rows):
+        matrix[i, :len(r)] = r
+    valid = ~np.isnan(matrix)
+    has_data = counts > 0
+
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        # Rows with no data are all-NaN; they come out as NaN and are reported as empty below
+        warnings.simplefilter("ignore", RuntimeWarning)
+        q_values = np.nanquantile(matrix, quantiles, axis=1) if n_rows and len(quantiles) else np.empty((0, n_rows))
+        abs_matrix = np.abs(matrix)
+        thresholds = np.asarray(tail_thresholds, dtype=float)
+        tail_counts = ((abs_matrix[:, :, None] > thresholds) & valid[:, :, None]).sum(axis=1)
+        tail_probs = tail_counts / np.maximum(counts, 1)[:, None]
+
+        if isinstance(bins, str) or np.ndim(bins) == 0:
+            if value_range is not None:
+                lo = np.full(n_rows, float(value_range[0]))
+                hi = np.full(n_rows, float(value_range[1]))
+            else:
+                lo = np.where(has_data, np.nanmin(matrix, axis=1), 0.0)
+                hi = np.where(has_data, np.nanmax(matrix, axis=1), 0.0)
+            # Degenerate range (one event, or all equal): open it up by 0.5% each side
+            flat = hi <= lo
+            lo, hi = np.where(flat, lo - 0.5, lo), np.where(flat, hi + 0.5, hi)
+            if isinstance(bins, str):
+                n_bins = _auto_bin_counts(matrix, counts, lo, hi)
+            else:
+                n_bins = np.full(n_rows, int(bins))
+            bin_width = (hi - lo) / n_bins
+            # Uniform bins per row: index by arithmetic instead of searching edges
+            idx = np.floor((matrix - lo[:, None]) / bin_width[:, None])
+            idx = np.where(matrix == hi[:, None], n_bins[:, None] - 1, idx)
+            edges = [lo[i] + bin_width[i] * np.arange(n_bins[i] + 1) for i in range(n_rows)]
+        else:
+            shared = np.asarray(bins, dtype=float)
+            n_bins = np.full(n_rows, len(shared) - 1)
+            idx = np.searchsorted(shared, matrix, side="right") - 1.0
+            idx = np.where(matrix == shared[-1], len(shared) - 2, idx)
+            edges = [shared] * n_rows
+
+        # Slot 0 is underflow, 1..n are the bins, n+1 is overflow
+        slots = np.clip(idx, -1, n_bins[:, None]) + 1
+        stride = int(n_bins.max(initial=0)) + 2
+        flat_slots = (np.arange(n_rows)[:, None] * stride + slots)[valid].astype(int)
+        histogram = np.bincount(flat_slots, minlength=n_rows * stride).reshape(n_rows, stride)
+
+    result = {}
+    for i, ticker in enumerate(tickers):
+        if not has_data[i]:
+            result[ticker] = {"count": 0, "bins": [], "underflow": None, "overflow": None,
+                              "quantiles": [], "tail_probabilities": []}
+            continue
+        e = edges[i]
+        result[ticker] = {
+            "count": int(counts[i]),
+            "bins": [{
+                "binStart": round(float(e[k]), 2),
+                "binEnd": round(float(e[k + 1]), 2),
+                "frequency": int(histogram[i, k + 1]),
+                "binLabel": f"{e[k]:.1f} to {e[k + 1]:.1f}",
+            } for k in range(n_bins[i])],
+            "underflow": {"binEnd": round(float(e[0]), 2), "frequency": int(histogram[i, 0])},
+            "overflow": {"binStart": round(float(e[-1]), 2), "frequency": int(histogram[i, n_bins[i] + 1])},
+            "quantiles": [{"q": q, "value": round(float(q_values[k, i]), 2)} for k, q in enumerate(quantiles)],
+            "tail_probabilities": [{"abs_move_above": float(t), "probability": round(float(tail_probs[i, k]), 4)}
+                                   for k, t in enumerate(thresholds)],
+        }
+    return result
+
+
+def parse_bins(value):
+    """Form/query value -> bins argument: "auto", an integer count, or comma-separated edges."""
+    value = (value or "auto").strip()
+    if value == "auto":
+        return "auto"
+    if "," in value:
+        edges = [float(v) for v in value.split(",")]
+        if not np.isfinite(edges).all():
+            raise ValueError("bin edges must be finite numbers")
+        if len(edges) < 2 or any(b <= a for a, b in zip(edges, edges[1:])):
+            raise ValueError("bin edges must be increasing")
+        return edges
+    count = int(value)
+    if not 1 <= count <= MAX_BINS:
+        raise ValueError(f"bin count must be between 1 and {MAX_BINS}")
+    return count
+
+
+def parse_value_range(range_min, range_max):
+    """Query range_min/range_max -> value_range argument: None when neither is given."""
+    if range_min is None and range_max is None:
+        return None
+    if range_min is None or range_max is None:
+        raise ValueError("range_min and range_max must be given together")
+    if not (np.isfinite(range_min) and np.isfinite(range_max)) or range_min >= range_max:
+        raise ValueError("range_min must be less than range_max")
+    return float(range_min), float(range_max)
@@ -368,3 +368,8 @@ MARUTI = [
 
 
 # Add more tickers below
+
+
+# Every ticker defined above, e.g. for batch jobs over the whole stored universe
+def stored_tickers():
+    return sorted(name for name, value in globals().items() if name.isupper() and isinstance(value, list))
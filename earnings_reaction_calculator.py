@@ -1,28 +1,16 @@
 
 
 #Latest
-import yfinance as yf
-import pandas as pd
-import numpy as np
 from datetime import timedelta, datetime
-import matplotlib.pyplot as plt
+import threading
+from price_providers import get_price_provider, price_provider_name
 
-def extract_dates_times_from_text(text):
-    # Pattern for 'DD MMM YYYY HH:MM', e.g. '18 Jul 2025 19:33'
-    pattern = r"(\d{1,2} [A-Za-z]{3} \d{4})\s+(\d{2}:\d{2})"
-    matches = re.findall(pattern, text)
-    dates_with_times = []
-    for dt_str, time_str in matches:
-        try:
-            dt_obj = datetime.strptime(dt_str, "%d %b %Y")
-            date_formatted = dt_obj.strftime("%Y-%m-%d")
-            dates_with_times.append((date_formatted, time_str))
-        except ValueError:
-            continue
-    return dates_with_times
+# pandas is imported inside the functions that use it, so importing this
+# module (and the API that depends on it) stays fast until prices are needed
 
 # Helper function to adjust Saturday dates to next Monday
 def adjust_dates_for_saturday(dates):
+    import pandas as pd
     adjusted_dates = []
     adjustments = {}  # Track changes for output notes
     for date_str in dates:
@@ -35,10 +23,10 @@ def adjust_dates_for_saturday(dates):
     return adjusted_dates, adjustments
 
 # Helper function to adjust dates based on time > 15:15 (after Saturday adjustment, skipping Saturday-adjusted ones)
-def adjust_dates_for_time(adjusted_dates, times, saturday_adjustments):
+def adjust_dates_for_time(dates, adjusted_dates, times, saturday_adjustments):
     final_dates = []
     time_adjustments = {}  # Track time-based changes
-    original_dates = sorted(dates)  # Assuming 'dates' is accessible; original sorted dates
+    original_dates = sorted(dates)  # Original sorted dates, parallel to adjusted_dates
 
     for i, date in enumerate(adjusted_dates):
         original_date = original_dates[i]
@@ -56,17 +44,67 @@ def adjust_dates_for_time(adjusted_dates, times, saturday_adjustments):
             if time_obj > threshold_time:
                 date += timedelta(days=1)  # Shift to next date
                 time_adjustments[original_date] = date.strftime('%Y-%m-%d')
-        except ValueError:
+        except (TypeError, ValueError):  # TypeError: OCR found no time for this date
             print(f"Invalid time format for {original_date}: {time_str}. Skipping time adjustment.")
 
         final_dates.append(date)
     return final_dates, time_adjustments
 
+# Reaction-day date for one (date, time) pair, using the same rules as the helpers above
+def effective_trading_date(date_str, time_str):
+    date = datetime.strptime(date_str, "%Y-%m-%d")
+    if date.weekday() == 5:  # Saturday -> next Monday, no time adjustment
+        return date + timedelta(days=2)
+    try:
+        if datetime.strptime(time_str, "%H:%M").time() > datetime.strptime("15:15", "%H:%M").time():
+            return date + timedelta(days=1)
+    except (TypeError, ValueError):
+        pass
+    return date
+
+# Per-provider, per-symbol daily OHLC history:
+# (provider, symbol) -> (covered_start, covered_end, data, fetched_on).
+# Filled on first use and refreshed by the pre-warm scheduler, so repeat
+# requests for a ticker slice memory instead of re-downloading.
+_price_cache = {}
+_price_cache_lock = threading.Lock()
+
+# Function to get cached daily OHLC over [start_date, end_date), fetching only what the cache lacks
+def get_price_history(stock_symbol, start_date, end_date, refresh=False, provider=None):
+    import pandas as pd
+    start_date = pd.Timestamp(start_date).normalize()
+    end_date = pd.Timestamp(end_date).normalize()
+    provider = price_provider_name(provider)
+    key = (provider, stock_symbol.upper())
+    today = pd.Timestamp.now().normalize()
+    with _price_cache_lock:
+        entry = _price_cache.get(key)
+    # Days after the fetch day had no bars yet when fetched; they are
+    # re-fetched on a later day (or by the scheduler's refresh), not on every call
+    stale = entry is not None and end_date > entry[3] + timedelta(days=1) and today > entry[3]
+    if refresh or stale or entry is None or start_date < entry[0] or end_date > entry[1]:
+        fetch_start, fetch_end = start_date, end_date
+        if entry is not None:
+            # Widen to the union so one download keeps covering earlier requests
+            fetch_start, fetch_end = min(start_date, entry[0]), max(end_date, entry[1])
+        data = get_price_provider(provider)(stock_symbol, fetch_start, fetch_end)
+        entry = (fetch_start, fetch_end, data, today)
+        with _price_cache_lock:
+            _price_cache[key] = entry
+    data = entry[2]
+    return data[(data.index >= start_date) & (data.index < end_date)]
+
+def clear_price_cache():
+    with _price_cache_lock:
+        _price_cache.clear()
+
 # Function to calculate price change and get OHLC for given dates (handles far-apart dates)
-def price_changes_for_dates(stock_symbol, dates_with_times, window_days=7, max_fallback_attempts=10):
+def price_changes_for_dates(stock_symbol, dates_with_times, window_days=7, max_fallback_attempts=10, progress=None,
+                            provider=None):
+    import pandas as pd
     # Extract dates and times from input tuples, sort by date
     sorted_pairs = sorted(dates_with_times, key=lambda x: pd.to_datetime(x[0]))
-    global dates  # Make dates global for access in helpers (temporary workaround)
+    # Kept local: requests, jobs and the pre-warm scheduler call this from several threads at once
     dates = [pair[0] for pair in sorted_pairs]
     times = [pair[1] for pair in sorted_pairs]
 
@@ -74,12 +112,19 @@ def price_changes_for_dates(stock_symbol, dates_with_times, window_days=7, max_f
     adjusted_dates, saturday_adjustments = adjust_dates_for_saturday(dates)
 
     # Then, adjust for time > 15:15, skipping Saturday-adjusted dates
-    final_dates, time_adjustments = adjust_dates_for_time(adjusted_dates, times, saturday_adjustments)
+    final_dates, time_adjustments = adjust_dates_for_time(dates, adjusted_dates, times, saturday_adjustments)
     final_dates = pd.to_datetime(final_dates)  # Ensure datetime format
 
     results = []
     na_fallback_adjustments = {}  # Track N/A fallback increments
 
+    # One cached history covering every window and fallback day, sliced per date below
+    if len(final_dates):
+        history = get_price_history(stock_symbol,
+                                    final_dates.min() - timedelta(days=window_days),
+                                    final_dates.max() + timedelta(days=max_fallback_attempts + 1),
+                                    provider=provider)
+
     for i, date in enumerate(final_dates):
         original_date = dates[i]  # For output reference
         attempt_date = date  # Start with final adjusted date
@@ -93,12 +138,8 @@ def price_changes_for_dates(stock_symbol, dates_with_times, window_days=7, max_f
             start_date = (attempt_date - timedelta(days=window_days)).strftime('%Y-%m-%d')
             end_date = (attempt_date + timedelta(days=1)).strftime('%Y-%m-%d')  # +1 to include the date
 
-            # Download historical data for this small range (add .NS for NSE stocks), suppress warning
-            data = yf.download(stock_symbol + ".NS", start=start_date, end=end_date, auto_adjust=False)
-
-            # Flatten multi-index columns if present
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.get_level_values(0)
+            # Slice this small range out of the cached history
+            data = history[(history.index >= start_date) & (history.index < end_date)]
 
             if data.empty or attempt_date not in data.index:
                 # No data: increment date by 1 and continue
@@ -149,6 +190,10 @@ def price_changes_for_dates(stock_symbol, dates_with_times, window_days=7, max_f
         if attempt_date != initial_attempt_date:
             na_fallback_adjustments[original_date] = f"{initial_attempt_date.strftime('%Y-%m-%d')} (original adjusted) -> {attempt_date.strftime('%Y-%m-%d')}"
 
+        # Report per-date progress to background job callers
+        if progress is not None:
+            progress(i + 1, len(final_dates))
+
     # Print any adjustments made
     if saturday_adjustments or time_adjustments or na_fallback_adjustments:
         print("Date Adjustments:")
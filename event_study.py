@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+import numpy as np
+
+from earnings_reaction_calculator import effective_trading_date, get_price_history
+
+# NIFTY 50; index symbols start with "^" and are fetched without the .NS suffix
+BENCHMARK_SYMBOL = "^NSEI"
+# Market model fitted over this many sessions, ending ESTIMATION_GAP sessions
+# before the reaction day so pre-result drift doesn't leak into beta
+ESTIMATION_WINDOW = 120
+ESTIMATION_GAP = 10
+# Fewer usable sessions than this and the event falls back to market-adjusted
+# returns (beta 1), e.g. for recent listings
+MIN_ESTIMATION_DAYS = 60
+# Same forward search for the reaction session as price_changes_for_dates
+MAX_FALLBACK_DAYS = 10
+
+
+def _closes(data):
+    """(days as datetime64[D], closes) with missing closes dropped."""
+    column = "Close" if "Close" in data.columns else "close"
+    closes = data[column].dropna()
+    return closes.index.values.astype("datetime64[D]"), closes.to_numpy(dtype=float)
+
+
+def market_model(stock_days, stock_close, bench_days, bench_close, event_days,
+                 window=ESTIMATION_WINDOW, gap=ESTIMATION_GAP, min_days=MIN_ESTIMATION_DAYS,
+                 max_fallback_days=MAX_FALLBACK_DAYS):
+    """Market-model abnormal returns for every event of one stock in a single vectorized pass.
+
+    Returns are close-to-close on the stock's own sessions, and the
+    benchmark is read as of each session, so a holiday in either series
+    doesn't shift the other. Each event gets an OLS alpha/beta over its
+    estimation window (one row of a gathered events x window matrix), and
+    its abnormal return is the reaction-day return less alpha + beta times
+    the market's return. Returns a dict of per-event arrays; events with no
+    reaction session are NaN.
+    """
+    n = len(stock_days)
+    if n < 2 or not len(bench_days):
+        # Nothing to measure against; every event comes out as NaN
+        stock_days = np.array(["1970-01-01", "1970-01-02"], dtype="datetime64[D]")
+        stock_close = np.full(2, np.nan)
+        n = 2
+    pos = np.searchsorted(bench_days, stock_days, side="right") - 1
+    market_close = np.where(pos >= 0, bench_close[np.maximum(pos, 0)], np.nan) if len(bench_days) else np.full(n, np.nan)
+    r_s = np.full(n, np.nan)
+    r_m = np.full(n, np.nan)
+    r_s[1:] = stock_close[1:] / stock_close[:-1] - 1
+    r_m[1:] = market_close[1:] / market_close[:-1] - 1
+
+    # First session on or after each reaction day, as the calculator's fallback finds it
+    e = np.searchsorted(stock_days, event_days)
+    e_clipped = np.minimum(e, n - 1)
+    found = (e < n) & (e >= 1) & ((stock_days[e_clipped] - event_days).astype(int) < max_fallback_days)
+
+    # events x window matrix of estimation-window session indices
+    idx = (e - gap - window)[:, None] + np.arange(window)
+    gathered = np.clip(idx, 0, n - 1)
+    xs = r_s[gathered]
+    xm = r_m[gathered]
+    mask = (idx >= 1) & np.isfinite(xs) & np.isfinite(xm)
+    count = mask.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xs0, xm0 = np.where(mask, xs, 0.0), np.where(mask, xm, 0.0)
+        mean_s = xs0.sum(axis=1) / count
+        mean_m = xm0.sum(axis=1) / count
+        ds = np.where(mask, xs - mean_s[:, None], 0.0)
+        dm = np.where(mask, xm - mean_m[:, None], 0.0)
+        var_m = (dm * dm).sum(axis=1)
+        fitted = (count >= min_days) & (var_m > 0)
+        beta = np.where(fitted, (ds * dm).sum(axis=1) / var_m, 1.0)
+        alpha = np.where(fitted, mean_s - beta * mean_m, 0.0)
+        residuals = np.where(mask, xs - alpha[:, None] - beta[:, None] * xm, 0.0)
+        residual_std = np.sqrt((residuals * residuals).sum(axis=1) / (count - np.where(fitted, 2, 1)))
+
+        event_return = np.where(found, r_s[e_clipped], np.nan)
+        market_return = np.where(found, r_m[e_clipped], np.nan)
+        expected = alpha + beta * market_return
+        abnormal = event_return - expected
+        zscore = abnormal / residual_std
+
+    return {
+        "return": event_return,
+        "market_return": market_return,
+        "alpha": alpha,
+        "beta": beta,
+        "expected_return": expected,
+        "abnormal_return": abnormal,
+        "abnormal_zscore": zscore,
+        "estimation_days": count,
+        "fitted": fitted,
+    }
+
+
+def _pct(value):
+    return round(float(value) * 100, 2) if np.isfinite(value) else None
+
+
+def _round(value, digits):
+    return round(float(value), digits) if np.isfinite(value) else None
+
+
+def event_studies(events_by_ticker, benchmark=BENCHMARK_SYMBOL, provider=None, window=ESTIMATION_WINDOW,
+                  gap=ESTIMATION_GAP, min_days=MIN_ESTIMATION_DAYS):
+    """Abnormal returns against `benchmark` for many tickers' (date, time) events.
+
+    The benchmark history is loaded once for the whole batch and reused for
+    every ticker; prices come from the shared cache in
+    earnings_reaction_calculator. Returns ticker -> one row per event, in
+    input order.
+    """
+    reaction_days = {
+        ticker: [effective_trading_date(date, time) for date, time in pairs]
+        for ticker, pairs in events_by_ticker.items()
+    }
+    all_days = [day for days in reaction_days.values() for day in days]
+    if not all_days:
+        return {ticker: [] for ticker in events_by_ticker}
+    # Calendar days covering the estimation window (5 sessions a week) plus holidays
+    lookback = timedelta(days=(window + gap) * 7 // 5 + 30)
+    lookahead = timedelta(days=MAX_FALLBACK_DAYS + 1)
+    bench_days, bench_close = _closes(get_price_history(
+        benchmark, min(all_days) - lookback, max(all_days) + lookahead, provider=provider))
+
+    studies = {}
+    for ticker, pairs in events_by_ticker.items():
+        days = reaction_days[ticker]
+        if not days:
+            studies[ticker] = []
+            continue
+        stock_days, stock_close = _closes(get_price_history(
+            ticker, min(days) - lookback, max(days) + lookahead, provider=provider))
+        model = market_model(stock_days, stock_close, bench_days, bench_close,
+                             np.array(days, dtype="datetime64[D]"), window=window, gap=gap, min_days=min_days)
+        studies[ticker] = [{
+            "date": date,
+            "market_change_pct": _pct(model["market_return"][i]),
+            "beta": _round(model["beta"][i], 3) if np.isfinite(model["return"][i]) else None,
+            "expected_change_pct": _pct(model["expected_return"][i]),
+            "abnormal_change_pct": _pct(model["abnormal_return"][i]),
+            "abnormal_zscore": _round(model["abnormal_zscore"][i], 2),
+            "estimation_days": int(model["estimation_days"][i]),
+            "model": (("market_model" if model["fitted"][i] else "market_adjusted")
+                      if np.isfinite(model["return"][i]) else None),
+        } for i, (date, _) in enumerate(pairs)]
+    return studies
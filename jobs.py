@@ -0,0 +1,128 @@
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Job states, in the order a job moves through them
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when a new job would take the queue past `max_queued` waiting jobs."""
+
+
+def dates_hash(dates_with_times):
+    """Stable digest of a list of (date, time) pairs, independent of input order."""
+    digest = hashlib.sha256()
+    for date, time_str in sorted(dates_with_times, key=lambda pair: (pair[0], pair[1] or "")):
+        digest.update(f"{date} {time_str or ''}\n".encode())
+    return digest.hexdigest()
+
+
+def bytes_hash(chunks):
+    """Stable digest of a list of uploaded file contents."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(hashlib.sha256(chunk).digest())
+    return digest.hexdigest()
+
+
+class JobQueue:
+    """In-process background job queue backed by a thread pool.
+
+    Jobs are deduplicated by key: submitting a key that is already queued
+    or running returns that job instead of starting a new one. Finished
+    jobs are not reused, so a resubmission after a transient price-fetch
+    failure, or after a new reaction session has traded, re-runs the work;
+    their results stay readable by job id until evicted oldest-first once
+    more than `max_finished` are held.
+
+    Each waiting job holds its arguments (raw uploads included) in memory,
+    so at most `max_queued` may wait for a worker; past that, submit raises
+    JobQueueFull.
+    """
+
+    def __init__(self, max_workers=2, max_finished=500, max_queued=8):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._by_key = {}
+        self._finished = []
+        self._max_finished = max_finished
+        self._max_queued = max_queued
+        self._queued = 0
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Queue `fn(progress, *args, **kwargs)` and return (job, deduplicated).
+
+        `progress(done, total)` may be called by `fn` to report how far it got.
+        """
+        with self._lock:
+            job_id = self._by_key.get(key)
+            if job_id is not None and self._jobs[job_id]["status"] in (QUEUED, RUNNING):
+                return self._snapshot(self._jobs[job_id]), True
+            if self._queued >= self._max_queued:
+                raise JobQueueFull(f"{self._queued} jobs are already waiting; try again shortly.")
+            self._queued += 1
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "status": QUEUED,
+                "progress": {"done": 0, "total": None},
+                "result": None,
+                "error": None,
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+            self._jobs[job["job_id"]] = job
+            self._by_key[key] = job["job_id"]
+            job["_key"] = key
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return self._snapshot(job), False
+
+    def get(self, job_id):
+        """Return a copy of the job record, or None if it is unknown or evicted."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job is not None else None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, fn, args, kwargs):
+        def progress(done, total):
+            with self._lock:
+                job["progress"] = {"done": done, "total": total}
+
+        with self._lock:
+            job["status"] = RUNNING
+            self._queued -= 1
+        try:
+            result = fn(progress, *args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                job["status"] = FAILED
+                job["error"] = str(e)
+                self._finish(job)
+            return
+        with self._lock:
+            job["status"] = DONE
+            job["result"] = result
+            self._finish(job)
+
+    def _finish(self, job):
+        # Caller holds the lock
+        job["finished_at"] = time.time()
+        self._finished.append(job["job_id"])
+        while len(self._finished) > self._max_finished:
+            old_id = self._finished.pop(0)
+            old = self._jobs.pop(old_id, None)
+            if old is not None and self._by_key.get(old["_key"]) == old_id:
+                del self._by_key[old["_key"]]
+
+    @staticmethod
+    def _snapshot(job):
+        return {k: v for k, v in job.items() if not k.startswith("_")}
@@ -0,0 +1,87 @@
+import os
+import threading
+
+import numpy as np
+
+from ocr_layout import events_from_words, ocr_events_tesseract, words_from_easyocr
+from ocr_parser import extract_dates_times_from_text
+from uploads import decode_image_bounded, open_image_bounded
+
+# name -> engine class; engines import their OCR stack in __init__, so only
+# the engine a deployment actually uses is ever loaded
+OCR_ENGINES = {}
+DEFAULT_OCR_ENGINE = "tesseract"
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+class OCREngineUnavailable(Exception):
+    """Raised when a registered engine's OCR stack isn't installed on this host."""
+
+
+def register_ocr_engine(name):
+    def decorator(cls):
+        OCR_ENGINES[name] = cls
+        return cls
+    return decorator
+
+
+def ocr_engine_name(name=None):
+    """Requested engine, else the OCR_ENGINE environment variable, else the default."""
+    name = name or os.environ.get("OCR_ENGINE", DEFAULT_OCR_ENGINE)
+    if name not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine {name!r}; choose from {', '.join(sorted(OCR_ENGINES))}.")
+    return name
+
+
+def get_ocr_engine(name=None):
+    """Shared engine instance, built on first use."""
+    name = ocr_engine_name(name)
+    with _instances_lock:
+        if name not in _instances:
+            try:
+                _instances[name] = OCR_ENGINES[name]()
+            except ImportError as e:
+                raise OCREngineUnavailable(f"OCR engine {name!r} is not installed ({e}).") from e
+        return _instances[name]
+
+
+def _pairs(events):
+    return list(dict.fromkeys((event["date"], event["time"]) for event in events))
+
+
+@register_ocr_engine("tesseract")
+class TesseractEngine:
+    """Tesseract via pytesseract; "layout" pairs from word boxes, "text" from the plain string."""
+
+    def __init__(self):
+        import pytesseract
+        try:
+            # The Python wrapper installs without the tesseract binary it shells out to
+            pytesseract.get_tesseract_version()
+        except pytesseract.TesseractNotFoundError as e:
+            raise OCREngineUnavailable(f"OCR engine 'tesseract' is not installed ({e}).") from e
+        self._pytesseract = pytesseract
+
+    def extract(self, contents, ocr_mode="layout"):
+        # Decoded at reduced resolution when larger than OCR needs
+        img = decode_image_bounded(contents)
+        if ocr_mode == "layout":
+            return _pairs(ocr_events_tesseract(img))
+        return extract_dates_times_from_text(self._pytesseract.image_to_string(img))
+
+
+@register_ocr_engine("easyocr")
+class EasyOCREngine:
+    """EasyOCR; its readtext boxes feed the same row pairing as Tesseract's."""
+
+    def __init__(self):
+        import easyocr
+        self._reader = easyocr.Reader(['en'])
+
+    def extract(self, contents, ocr_mode="layout"):
+        results = self._reader.readtext(np.array(open_image_bounded(contents)))
+        if ocr_mode == "layout":
+            return _pairs(events_from_words(words_from_easyocr(results)))
+        return extract_dates_times_from_text("\n".join(result[1] for result in results))
@@ -0,0 +1,192 @@
+import numpy as np
+
+from ocr_parser import build_event, scan_tokens
+
+# Longest image side the layout probe runs at; larger screenshots are
+# downscaled for the probe and only their date/time columns are OCR'd at
+# full resolution
+LAYOUT_PROBE_SIDE = 1600
+# Skip the column crop when the date/time columns cover most of the page anyway
+MAX_COLUMN_FRACTION = 0.6
+# Horizontal padding around the date/time columns, in line heights
+COLUMN_PADDING = 1.5
+
+
+def words_from_tesseract_data(data, scale=1.0, x_offset=0, y_offset=0):
+    """Words from pytesseract.image_to_data(..., output_type=Output.DICT).
+
+    Each word is (text, left, top, width, height) in original image pixels;
+    `scale` undoes a downscaled probe and the offsets undo a crop.
+    """
+    words = []
+    for i, text in enumerate(data["text"]):
+        text = str(text).strip()
+        if not text or float(data["conf"][i]) < 0:
+            continue
+        words.append((
+            text,
+            data["left"][i] / scale + x_offset,
+            data["top"][i] / scale + y_offset,
+            data["width"][i] / scale,
+            data["height"][i] / scale,
+        ))
+    return words
+
+
+def words_from_easyocr(results):
+    """Words from easyocr.Reader.readtext: (bbox, text, confidence) with 4-point boxes."""
+    words = []
+    for bbox, text, _ in results:
+        xs = [point[0] for point in bbox]
+        ys = [point[1] for point in bbox]
+        words.append((str(text).strip(), min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)))
+    return [word for word in words if word[0]]
+
+
+def group_rows(words):
+    """Cluster words into visual rows by vertical centre, each row sorted left to right."""
+    if not words:
+        return []
+    tolerance = 0.6 * float(np.median([word[4] for word in words]))
+    rows = []
+    current = []
+    current_centre = None
+    for word in sorted(words, key=lambda w: w[2] + w[4] / 2):
+        centre = word[2] + word[4] / 2
+        if current and centre - current_centre > tolerance:
+            rows.append(sorted(current, key=lambda w: w[1]))
+            current = []
+        current.append(word)
+        current_centre = float(np.mean([w[2] + w[4] / 2 for w in current]))
+    rows.append(sorted(current, key=lambda w: w[1]))
+    return rows
+
+
+def _row_tokens(row, row_index):
+    """Date/time tokens in one row, each with its x-span, y-centre and height."""
+    text_parts = []
+    spans = []
+    position = 0
+    for word in row:
+        spans.append((position, position + len(word[0]), word))
+        text_parts.append(word[0])
+        position += len(word[0]) + 1
+    tokens = []
+    for kind, value, flags, raw, start, end in scan_tokens(" ".join(text_parts)):
+        covered = [word for s, e, word in spans if s < end and e > start]
+        left = min(word[1] for word in covered)
+        right = max(word[1] + word[3] for word in covered)
+        top = min(word[2] for word in covered)
+        bottom = max(word[2] + word[4] for word in covered)
+        tokens.append({
+            "token": (kind, value, flags, raw, row_index),
+            "left": left,
+            "right": right,
+            "centre_y": (top + bottom) / 2,
+            "height": bottom - top,
+        })
+    return tokens
+
+
+def events_from_rows(rows):
+    """Pair dates with times using geometry instead of reading order.
+
+    A date takes the nearest time to its right on the same row, stopping at
+    the next date, so side-by-side tables stay apart. A date with no time on
+    its row takes the closest unused time below it in the same column (a
+    two-line "date / time" cell), within a couple of line heights.
+    """
+    row_tokens = [_row_tokens(row, i) for i, row in enumerate(rows)]
+    used = set()
+    pairs = []
+    for i, tokens in enumerate(row_tokens):
+        for n, tok in enumerate(tokens):
+            if tok["token"][0] != "date":
+                continue
+            match = None
+            for m in range(n + 1, len(tokens)):
+                if tokens[m]["token"][0] == "date":
+                    break
+                if (i, m) not in used:
+                    match = (i, m)
+                    break
+            if match is None:
+                match = _time_below(tok, i, row_tokens, used)
+            if match is not None:
+                used.add(match)
+            pairs.append((tok, match))
+
+    events = []
+    for tok, match in pairs:
+        if match is None:
+            events.append(build_event(tok["token"], None))
+        else:
+            time_tok = row_tokens[match[0]][match[1]]["token"]
+            events.append(build_event(tok["token"], time_tok))
+    return events
+
+
+def _time_below(date_tok, row_index, row_tokens, used):
+    max_gap = 2.5 * max(date_tok["height"], 1)
+    pad = date_tok["height"]
+    best = None
+    for i in range(row_index + 1, len(row_tokens)):
+        for m, tok in enumerate(row_tokens[i]):
+            if tok["token"][0] != "time" or (i, m) in used:
+                continue
+            gap = tok["centre_y"] - date_tok["centre_y"]
+            if gap > max_gap:
+                return best
+            centre_x = (tok["left"] + tok["right"]) / 2
+            if date_tok["left"] - pad <= centre_x <= date_tok["right"] + pad:
+                if best is None or gap < best[0]:
+                    best = (gap, (i, m))
+        if best is not None:
+            return best[1]
+    return best[1] if best is not None else None
+
+
+def events_from_words(words):
+    return events_from_rows(group_rows(words))
+
+
+def _date_time_columns(rows, image_width):
+    """x-range covering every date/time token on the page, padded; None if there are none."""
+    spans = [(tok["left"], tok["right"], tok["height"]) for i, row in enumerate(rows) for tok in _row_tokens(row, i)]
+    if not spans:
+        return None
+    pad = COLUMN_PADDING * float(np.median([h for _, _, h in spans]))
+    left = max(0, int(min(s[0] for s in spans) - pad))
+    right = min(image_width, int(max(s[1] for s in spans) + pad))
+    return left, right
+
+
+def ocr_events_tesseract(img):
+    """Layout-aware Tesseract OCR of a BGR/grayscale image into parsed events.
+
+    Small images get a single word-level pass. Larger ones are probed at
+    LAYOUT_PROBE_SIDE to find the date/time columns, and only that strip is
+    recognised at full resolution instead of the whole page.
+    """
+    import cv2
+    import pytesseract
+
+    height, width = img.shape[:2]
+    if max(height, width) <= LAYOUT_PROBE_SIDE:
+        data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
+        return events_from_words(words_from_tesseract_data(data))
+
+    scale = LAYOUT_PROBE_SIDE / max(height, width)
+    probe = cv2.resize(img, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    probe_data = pytesseract.image_to_data(probe, output_type=pytesseract.Output.DICT)
+    probe_rows = group_rows(words_from_tesseract_data(probe_data, scale=scale))
+    columns = _date_time_columns(probe_rows, width)
+    if columns is None or (columns[1] - columns[0]) > MAX_COLUMN_FRACTION * width:
+        # Probe found nothing to crop to (text too small, or dates all over
+        # the page); fall back to one full-resolution pass
+        data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
+        return events_from_words(words_from_tesseract_data(data))
+    left, right = columns
+    # Block mode: the strip is a single column of uniform text
+    data = pytesseract.image_to_data(img[:, left:right], config="--psm 6", output_type=pytesseract.Output.DICT)
+    return events_from_words(words_from_tesseract_data(data, x_offset=left))
@@ -0,0 +1,170 @@
+import re
+from datetime import date as date_cls
+
+# Month names as they show up in exchange filings and broker screenshots
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MON = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+
+# One alternation so the whole text is scanned once. The leading lookahead
+# lets the scanner skip any position that can't start a token without trying
+# every branch. Order matters: ISO has to be tried before day-first numeric.
+# ISO timestamps ("2025-07-18T19:33") split into a date and a time token.
+TOKEN_RE = re.compile(
+    r"(?=[\djfmasond])(?:"
+    r"(?P<dmy>\b(?P<d1>\d{1,2})(?:st|nd|rd|th)?[ -](?P<m1>" + _MON + r")[ ,-]\s*(?P<y1>\d{4})\b)"
+    r"|(?P<mdy>\b(?P<m2>" + _MON + r")\s+(?P<d2>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<y2>\d{4})\b)"
+    r"|(?P<iso>\b(?P<y3>\d{4})[-/.](?P<m3>\d{1,2})[-/.](?P<d3>\d{1,2})(?:\b|(?=T\d)))"
+    r"|(?P<num>\b(?P<a4>\d{1,2})[-/.](?P<b4>\d{1,2})[-/.](?P<y4>\d{4})\b)"
+    r"|(?P<time>(?:\b|(?<=\dT))(?P<hh>[01]?\d|2[0-3]):(?P<mm>[0-5]\d)(?::[0-5]\d)?(?:\s*(?P<ampm>[ap]\.?m\.?))?(?![\d:])))",
+    re.IGNORECASE,
+)
+
+# Flags attached to events; any of these drops the confidence below "high"
+NO_TIME = "no_time"
+AMBIGUOUS_DAY_MONTH = "ambiguous_day_month"
+COLUMN_PAIRING = "column_pairing"
+AMBIGUOUS_PAIRING = "ambiguous_pairing"
+TIME_ON_OTHER_LINE = "time_on_other_line"
+
+_LOW_CONFIDENCE_FLAGS = {NO_TIME, AMBIGUOUS_DAY_MONTH, AMBIGUOUS_PAIRING}
+
+
+def _date_from_match(kind, m):
+    """Return (iso date, flags) for a date token, or None if it isn't a real date."""
+    flags = []
+    if kind == "dmy":
+        year, month, day = int(m.group("y1")), _MONTHS[m.group("m1")[:3].lower()], int(m.group("d1"))
+    elif kind == "mdy":
+        year, month, day = int(m.group("y2")), _MONTHS[m.group("m2")[:3].lower()], int(m.group("d2"))
+    elif kind == "iso":
+        year, month, day = int(m.group("y3")), int(m.group("m3")), int(m.group("d3"))
+    else:
+        # Indian filings are day-first; only swap when the first field can't be a day-month pair
+        first, second, year = int(m.group("a4")), int(m.group("b4")), int(m.group("y4"))
+        day, month = first, second
+        if second > 12 and first <= 12:
+            day, month = second, first
+        elif first <= 12 and second <= 12 and first != second:
+            flags.append(AMBIGUOUS_DAY_MONTH)
+    try:
+        return date_cls(year, month, day).isoformat(), flags
+    except ValueError:
+        return None
+
+
+def _time_from_match(m):
+    hour, minute = int(m.group("hh")), int(m.group("mm"))
+    ampm = m.group("ampm")
+    if ampm:
+        if hour > 12 or hour == 0:
+            return None
+        is_pm = ampm[0].lower() == "p"
+        hour = hour % 12 + (12 if is_pm else 0)
+    return f"{hour:02d}:{minute:02d}"
+
+
+def scan_tokens(text):
+    """Single pass over the text: ("date" | "time", value, flags, raw, start, end) tokens.
+
+    The character span lets callers that know where each character sits on
+    the page place the tokens.
+    """
+    tokens = []
+    for m in TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "time":
+            value, flags = _time_from_match(m), ()
+        else:
+            parsed = _date_from_match(kind, m)
+            value, flags = parsed if parsed is not None else (None, ())
+        if value is not None:
+            tokens.append(("time" if kind == "time" else "date", value, flags, m.group(0), m.start(), m.end()))
+    return tokens
+
+
+def _tokenize(text):
+    """scan_tokens with each token's line number in place of its span."""
+    tokens = []
+    line = 0
+    last = 0
+    for kind, value, flags, raw, start, _ in scan_tokens(text):
+        line += text.count("\n", last, start)
+        last = start
+        tokens.append((kind, value, flags, raw, line))
+    return tokens
+
+
+def build_event(date_tok, time_tok, extra_flags=()):
+    """Event dict from a date token and its paired time token (or None)."""
+    _, date_value, date_flags, raw, line = date_tok
+    flags = list(date_flags) + list(extra_flags)
+    if time_tok is None:
+        flags.append(NO_TIME)
+    elif time_tok[4] != line:
+        flags.append(TIME_ON_OTHER_LINE)
+    if _LOW_CONFIDENCE_FLAGS.intersection(flags):
+        confidence = "low"
+    elif flags:
+        confidence = "medium"
+    else:
+        confidence = "high"
+    return {
+        "date": date_value,
+        "time": time_tok[1] if time_tok is not None else None,
+        "raw": raw if time_tok is None else f"{raw} {time_tok[3]}",
+        "line": line,
+        "confidence": confidence,
+        "flags": flags,
+    }
+
+
+def parse_events(text):
+    """Parse OCR text into earnings events.
+
+    Dates in any supported layout ("18 Jul 2025", "Jul 18, 2025",
+    "2025-07-18", "18/07/2025") are paired with times by position: each run
+    of consecutive dates is matched with the run of times that follows it.
+    Equal runs pair in order, which covers both "date time" rows and
+    screenshots OCR'd column by column. A single trailing time goes to the
+    date right before it, so a date missing its time no longer shifts every
+    later pair. Each event is a dict with date, time (or None), raw, line,
+    confidence ("high" | "medium" | "low") and flags.
+    """
+    tokens = _tokenize(text)
+    events = []
+    i = 0
+    while i < len(tokens):
+        if tokens[i][0] == "time":
+            # Time with no date before it
+            i += 1
+            continue
+        j = i
+        while j < len(tokens) and tokens[j][0] == "date":
+            j += 1
+        k = j
+        while k < len(tokens) and tokens[k][0] == "time":
+            k += 1
+        date_run, time_run = tokens[i:j], tokens[j:k]
+        if not time_run:
+            events.extend(build_event(d, None) for d in date_run)
+        elif len(date_run) == len(time_run):
+            extra = (COLUMN_PAIRING,) if len(date_run) > 1 else ()
+            events.extend(build_event(d, t, extra) for d, t in zip(date_run, time_run))
+        elif len(time_run) == 1:
+            events.extend(build_event(d, None) for d in date_run[:-1])
+            events.append(build_event(date_run[-1], time_run[0]))
+        else:
+            # Counts disagree inside a column block; pair in order and say so
+            for n, d in enumerate(date_run):
+                events.append(build_event(d, time_run[n] if n < len(time_run) else None, (AMBIGUOUS_PAIRING,)))
+        i = k
+    return events
+
+
+def extract_dates_times_from_text(text):
+    """(date, time) pairs for price_changes_for_dates; time is None when OCR found none."""
+    pairs = [(event["date"], event["time"]) for event in parse_events(text)]
+    return list(dict.fromkeys(pairs))
@@ -0,0 +1,214 @@
+import os
+import zlib
+
+import numpy as np
+
+# name -> fetch(stock_symbol, start_date, end_date) returning daily OHLC over
+# [start_date, end_date) indexed by date. Providers import their data
+# libraries (pandas included) on first call, so an unused provider costs
+# nothing at startup.
+PRICE_PROVIDERS = {}
+DEFAULT_PRICE_PROVIDER = "yfinance"
+
+
+def register_price_provider(name):
+    def decorator(fetch):
+        PRICE_PROVIDERS[name] = fetch
+        return fetch
+    return decorator
+
+
+def price_provider_name(name=None):
+    """Requested provider, else the PRICE_PROVIDER environment variable, else the default."""
+    name = name or os.environ.get("PRICE_PROVIDER", DEFAULT_PRICE_PROVIDER)
+    if name not in PRICE_PROVIDERS:
+        raise ValueError(f"Unknown price provider {name!r}; choose from {', '.join(sorted(PRICE_PROVIDERS))}.")
+    return name
+
+
+def get_price_provider(name=None):
+    return PRICE_PROVIDERS[price_provider_name(name)]
+
+
+@register_price_provider("yfinance")
+def yfinance_price_history(stock_symbol, start_date, end_date):
+    import pandas as pd
+    import yfinance as yf
+
+    # Add .NS for NSE stocks; index symbols like ^NSEI are used as-is
+    yahoo_symbol = stock_symbol if stock_symbol.startswith("^") else stock_symbol + ".NS"
+    data = yf.download(yahoo_symbol, start=start_date.strftime('%Y-%m-%d'),
+                       end=end_date.strftime('%Y-%m-%d'), auto_adjust=False, progress=False)
+    # Flatten multi-index columns if present
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    return data
+
+
+# Synthetic series all start here so any requested range slices the same bars
+SYNTHETIC_EPOCH = "2000-01-03"
+# Index every synthetic stock loads on, so event-study betas have something to find
+SYNTHETIC_MARKET = "^NSEI"
+# Daily log-return cap matching NSE's widest circuit band of 20%
+PRICE_BAND = np.log(1.2)
+# Announcement times used for the generated calendar of symbols with no stored dates
+_SYNTHETIC_TIMES = ("11:30", "14:45", "16:30", "18:15", "20:00")
+
+
+def _symbol_rng(stock_symbol, stream):
+    # crc32 rather than hash(): hash randomization would change the prices per process
+    seed = int(os.environ.get("SYNTHETIC_PRICE_SEED", "0"))
+    return np.random.default_rng([seed, zlib.crc32(stock_symbol.upper().encode()), stream])
+
+
+def synthetic_event_dates(stock_symbol, end_date=None):
+    """(date, time) earnings events the synthetic prices react to.
+
+    Stored tickers use their real dates from earnings_dates; any other
+    symbol gets a deterministic quarterly calendar, so load tests can run
+    over thousands of made-up tickers.
+    """
+    import earnings_dates
+
+    stored = getattr(earnings_dates, stock_symbol.upper(), None)
+    if stored:
+        return list(stored)
+    end_day = np.datetime64(end_date, "D") if end_date is not None else np.datetime64("today", "D")
+    rng = _symbol_rng(stock_symbol, 1)
+    # ~100 quarters cover the epoch to today; draw them all at once and trim
+    n = int((end_day - np.datetime64(SYNTHETIC_EPOCH, "D")).astype(int) // 82) + 1
+    gaps = np.concatenate(([rng.integers(20, 91)], rng.integers(82, 101, size=n)))
+    days = np.datetime64(SYNTHETIC_EPOCH, "D") + np.cumsum(gaps)
+    # Own stream: the gap draws above vary in number with end_date, and must
+    # not shift the times (or any later draw) when a wider range is asked for
+    times = _symbol_rng(stock_symbol, 4).integers(len(_SYNTHETIC_TIMES), size=len(days))
+    return [(str(day), _SYNTHETIC_TIMES[t]) for day, t in zip(days, times) if day < end_day]
+
+
+@register_price_provider("synthetic")
+def synthetic_price_history(stock_symbol, start_date, end_date):
+    """Deterministic OHLC for offline runs and load tests, with earnings gaps on the event dates.
+
+    Each symbol gets its own price level, volatility and beta to a shared
+    synthetic market series (SYNTHETIC_MARKET). Daily returns are
+    fat-tailed (Student-t, 4 dof) and held inside the 20% price band, and
+    on the reaction day of every event from synthetic_event_dates the price
+    gaps by a 2.5-4.5% standard deviation move, for the 2-4% typical of
+    large-cap result reactions. Index symbols ("^...") follow the market
+    series alone, with no earnings events. Prices are rounded to the NSE
+    tick of 0.05.
+    """
+    import pandas as pd
+
+    from earnings_reaction_calculator import effective_trading_date
+
+    calendar = np.arange(np.datetime64(SYNTHETIC_EPOCH, "D"), np.datetime64(pd.Timestamp(end_date), "D"))
+    days = pd.DatetimeIndex(calendar[np.is_busday(calendar)])
+    columns = ["Open", "High", "Low", "Close"]
+    if len(days) == 0:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([]))
+    level, vol, earnings_mult, beta = _symbol_rng(stock_symbol, 0).random(4)
+    # Draws are generated row by row, so a day's bar never depends on the range asked for
+    draws = _symbol_rng(stock_symbol, 2).standard_t(4, size=(len(days), 4)) / np.sqrt(2)
+    market = 0.13 / np.sqrt(252) * _symbol_rng(SYNTHETIC_MARKET, 3).standard_t(4, size=len(days)) / np.sqrt(2)
+
+    if stock_symbol.startswith("^"):
+        base_price = 5000 + 20000 * level
+        daily_vol = 0.13 / np.sqrt(252)
+        gap = 0.3 * market
+        intraday = 0.7 * market
+    else:
+        base_price = np.exp(np.log(50) + level * np.log(100))  # 50 to 5000
+        daily_vol = (0.18 + 0.27 * vol) / np.sqrt(252)
+        beta = 0.5 + beta  # 0.5 to 1.5
+        jumps = np.zeros(len(days))
+        reaction_days = pd.DatetimeIndex([effective_trading_date(d, t)
+                                          for d, t in synthetic_event_dates(stock_symbol, end_date)])
+        event_idx = days.searchsorted(reaction_days)  # weekend reactions roll to the next session
+        event_idx = event_idx[event_idx < len(days)]
+        jumps[event_idx] = (0.025 + 0.02 * earnings_mult) * np.clip(draws[event_idx, 3], -3, 3)
+        # The market explains part of each day's move; the rest is the stock's own
+        own_vol = np.sqrt(np.maximum(daily_vol ** 2 - (beta * 0.13) ** 2 / 252, (0.1 * daily_vol) ** 2))
+        gap = 0.25 * own_vol * draws[:, 1] + 0.3 * beta * market + jumps
+        intraday = own_vol * draws[:, 0] + 0.7 * beta * market
+    # NSE's widest price band: no open, high, low or close beyond 20% of the previous close
+    gap = np.clip(gap, -PRICE_BAND, PRICE_BAND)
+    intraday = np.clip(gap + intraday + 0.0002, -PRICE_BAND, PRICE_BAND) - gap
+    log_close = np.log(base_price) + np.cumsum(gap + intraday)
+    prev_close = np.exp(np.concatenate(([np.log(base_price)], log_close[:-1])))
+    close = np.exp(log_close)
+    open_ = np.exp(log_close - intraday)
+    wick = np.exp((0.2 + 0.5 * np.abs(draws[:, 2])) * daily_vol)
+    data = pd.DataFrame({
+        "Open": open_,
+        "High": np.minimum(np.maximum(open_, close) * wick, prev_close * np.exp(PRICE_BAND)),
+        "Low": np.maximum(np.minimum(open_, close) / wick, prev_close * np.exp(-PRICE_BAND)),
+        "Close": close,
+    }, index=days)
+    data = (data * 20).round() / 20
+    return data[data.index >= pd.Timestamp(start_date)]
+
+
+# Older configs name the offline provider "mock"
+register_price_provider("mock")(synthetic_price_history)
+
+
+_replay_frames = {}
+
+
+def _empty_ohlc():
+    import pandas as pd
+
+    return pd.DataFrame(columns=["Open", "High", "Low", "Close"], index=pd.DatetimeIndex([]))
+
+
+def _replay_path():
+    return os.environ.get("PRICE_REPLAY_PATH", "price_replay")
+
+
+def _load_replay(stock_symbol):
+    """Recorded OHLC for one symbol: <path>/<SYMBOL>.csv, or rows of a single CSV with a Symbol column."""
+    import pandas as pd
+
+    path = _replay_path()
+    key = (path, stock_symbol.upper())
+    if key in _replay_frames:
+        return _replay_frames[key]
+    if not os.path.exists(path):
+        # Nothing recorded yet: same as a symbol with no rows, but not cached
+        # so a later record_replay is picked up
+        return _empty_ohlc()
+    if os.path.isdir(path):
+        file_path = os.path.join(path, f"{stock_symbol.upper()}.csv")
+        frames = {stock_symbol.upper(): pd.read_csv(file_path)} if os.path.exists(file_path) else {}
+    else:
+        table = pd.read_csv(path)
+        table.columns = [c.strip().title() for c in table.columns]
+        frames = {symbol.upper(): group.drop(columns="Symbol") for symbol, group in table.groupby("Symbol")}
+    for symbol, frame in frames.items():
+        frame.columns = [c.strip().title() for c in frame.columns]
+        frame = frame.set_index(pd.to_datetime(frame.pop("Date"))).sort_index()
+        _replay_frames[(path, symbol)] = frame[["Open", "High", "Low", "Close"]]
+    if key not in _replay_frames:
+        _replay_frames[key] = _empty_ohlc()
+    return _replay_frames[key]
+
+
+@register_price_provider("replay")
+def replay_price_history(stock_symbol, start_date, end_date):
+    """OHLC replayed from local CSVs at PRICE_REPLAY_PATH (Date, Open, High, Low, Close)."""
+    import pandas as pd
+
+    data = _load_replay(stock_symbol)
+    return data[(data.index >= pd.Timestamp(start_date)) & (data.index < pd.Timestamp(end_date))]
+
+
+def record_replay(symbols, path, start_date, end_date, provider=DEFAULT_PRICE_PROVIDER):
+    """Save OHLC from `provider` as <path>/<SYMBOL>.csv files for the replay provider."""
+    import pandas as pd
+
+    os.makedirs(path, exist_ok=True)
+    fetch = get_price_provider(provider)
+    for symbol in symbols:
+        data = fetch(symbol, pd.Timestamp(start_date), pd.Timestamp(end_date))[["Open", "High", "Low", "Close"]]
+        data.rename_axis("Date").to_csv(os.path.join(path, f"{symbol.upper()}.csv"))
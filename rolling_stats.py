@@ -0,0 +1,92 @@
+import math
+from collections import deque
+
+# Last N results for the rolling bands: two years of quarterly results
+DEFAULT_WINDOW = 8
+# Half-life, in results, of the exponentially weighted bands
+DEFAULT_HALFLIFE = 4
+
+
+def _bands(mean, std):
+    if mean is None:
+        return {"absolute_mean": None, "first_std": None, "second_std": None, "third_std": None}
+    return {
+        "absolute_mean": round(mean, 2),
+        "first_std": round(mean + std, 2),
+        "second_std": round(mean + 2 * std, 2),
+        "third_std": round(mean + 3 * std, 2),
+    }
+
+
+class MoveBands:
+    """Rolling-window and EWMA sigma bands over absolute % moves, in event order.
+
+    Bands follow the full-history stats in /analyze: mean of absolute moves
+    plus 1/2/3 standard deviations. The rolling window keeps running sums
+    and drops the oldest move as a new one arrives, and the EWMA mean and
+    variance are updated in place, so a full history is a single pass.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, halflife=DEFAULT_HALFLIFE):
+        if window < 1 or not math.isfinite(halflife) or halflife <= 0:
+            raise ValueError("window must be at least 1 and halflife a positive finite number")
+        self.window = window
+        self.halflife = halflife
+        self._alpha = 1 - 0.5 ** (1 / halflife)
+        self._recent = deque()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._ewma_mean = None
+        self._ewma_var = 0.0
+        self.count = 0
+
+    def update(self, move):
+        """Add the next event's % move; None (no price data) is skipped."""
+        if move is None:
+            return
+        x = abs(float(move))
+        self.count += 1
+        self._recent.append(x)
+        self._sum += x
+        self._sum_sq += x * x
+        if len(self._recent) > self.window:
+            old = self._recent.popleft()
+            self._sum -= old
+            self._sum_sq -= old * old
+        if self._ewma_mean is None:
+            self._ewma_mean = x
+        else:
+            # Incremental exponentially weighted mean and variance
+            diff = x - self._ewma_mean
+            increment = self._alpha * diff
+            self._ewma_mean += increment
+            self._ewma_var = (1 - self._alpha) * (self._ewma_var + diff * increment)
+
+    def bands(self):
+        n = len(self._recent)
+        if n:
+            mean = self._sum / n
+            std = math.sqrt(max(self._sum_sq / n - mean * mean, 0.0))
+            rolling = _bands(mean, std)
+        else:
+            rolling = _bands(None, None)
+        ewma = _bands(self._ewma_mean, math.sqrt(self._ewma_var))
+        return {
+            "rolling": {"window": self.window, "count": n, **rolling},
+            "ewma": {"halflife": self.halflife, "count": self.count, **ewma},
+        }
+
+
+def sigma_bands(moves_by_ticker, window=DEFAULT_WINDOW, halflife=DEFAULT_HALFLIFE):
+    """Current rolling and EWMA bands for many tickers in one pass.
+
+    `moves_by_ticker` maps ticker -> % moves in chronological order (None
+    entries are skipped).
+    """
+    result = {}
+    for ticker, moves in moves_by_ticker.items():
+        bands = MoveBands(window, halflife)
+        for move in moves:
+            bands.update(move)
+        result[ticker] = bands.bands()
+    return result
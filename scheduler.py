@@ -0,0 +1,114 @@
+import logging
+import threading
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+import earnings_dates
+from earnings_reaction_calculator import effective_trading_date, get_price_history
+
+logger = logging.getLogger(__name__)
+
+IST = ZoneInfo("Asia/Kolkata")
+MARKET_OPEN = time(9, 15)
+MARKET_CLOSE = time(15, 30)
+
+# History fetched on a refresh starts this many days before a ticker's first event
+HISTORY_PADDING_DAYS = 7
+
+
+def refresh_ticker_prices(ticker, today):
+    """Re-download the full price history needed for a ticker's stored events."""
+    stored = getattr(earnings_dates, ticker, None) or []
+    if not stored:
+        return
+    first_date = min(datetime.strptime(date, "%Y-%m-%d") for date, _ in stored)
+    get_price_history(ticker, first_date - timedelta(days=HISTORY_PADDING_DAYS),
+                      today + timedelta(days=1), refresh=True)
+
+
+class PrewarmScheduler:
+    """Keeps the price cache warm for every ticker in `earnings_dates`.
+
+    Each weekday, `lead` before market open, every stored ticker's prices are
+    re-downloaded. Once the reaction session of a stored event closes, that
+    ticker is refreshed straight away and `recompute(ticker)` is called so its
+    reaction stats include the new move.
+
+    `clock` returns the current aware datetime and `sleep` waits a number of
+    seconds; both are injectable so the schedule can be driven offline.
+    `refresh(ticker, today)` defaults to re-downloading the ticker's prices.
+    """
+
+    def __init__(self, clock=None, sleep=None, refresh=None, recompute=None, tickers=None,
+                 lead=timedelta(minutes=30), poll_seconds=60, prewarm_on_start=True):
+        self.clock = clock or (lambda: datetime.now(IST))
+        self.refresh = refresh or refresh_ticker_prices
+        self.recompute = recompute
+        self.tickers = tickers or earnings_dates.stored_tickers
+        self.lead = lead
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._sleep = sleep or self._stop.wait
+        self._thread = None
+        self._last_tick = None
+        self._next_prewarm = None if prewarm_on_start else self.next_prewarm_time(self.clock())
+
+    def next_prewarm_time(self, now):
+        """First weekday pre-warm time strictly after `now`."""
+        now = now.astimezone(IST)
+        day = now.date()
+        while True:
+            candidate = datetime.combine(day, MARKET_OPEN, tzinfo=IST) - self.lead
+            if candidate.weekday() < 5 and candidate > now:
+                return candidate
+            day += timedelta(days=1)
+
+    def events_closed_between(self, since, now):
+        """Stored (ticker, date) events whose reaction session closed in (since, now]."""
+        closed = []
+        for ticker in self.tickers():
+            for date, time_str in getattr(earnings_dates, ticker, None) or []:
+                # A Friday-evening result reacts on Monday, not on the Saturday after it
+                reaction_day = np.busday_offset(np.datetime64(effective_trading_date(date, time_str).date(), "D"),
+                                                0, roll="forward").astype(object)
+                session_close = datetime.combine(reaction_day, MARKET_CLOSE, tzinfo=IST)
+                if since < session_close <= now:
+                    closed.append((ticker, date))
+        return closed
+
+    def tick(self):
+        """Run whatever work is due at the current clock time."""
+        now = self.clock().astimezone(IST)
+        today = datetime.combine(now.date(), time())
+        if self._next_prewarm is None or now >= self._next_prewarm:
+            for ticker in self.tickers():
+                self._run(ticker, today, recompute=True)
+            self._next_prewarm = self.next_prewarm_time(now)
+        elif self._last_tick is not None:
+            for ticker in sorted({ticker for ticker, _ in self.events_closed_between(self._last_tick, now)}):
+                self._run(ticker, today, recompute=True)
+        self._last_tick = now
+
+    def _run(self, ticker, today, recompute):
+        try:
+            self.refresh(ticker, today)
+            if recompute and self.recompute is not None:
+                self.recompute(ticker)
+        except Exception as e:
+            logger.warning(f"Pre-warm failed for {ticker}: {e}")
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            self.tick()
+            self._sleep(self.poll_seconds)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="price-prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,115 @@
+import math
+from datetime import datetime, timedelta
+
+# Companies tend to report each quarter about 52 weeks after the same quarter
+# a year earlier, usually on the same weekday
+REPORTING_CYCLE = timedelta(weeks=52)
+# Historical baselines the implied move can be compared against
+SCREEN_BASELINES = ("full", "rolling", "ewma")
+
+
+def parse_date(value):
+    return datetime.strptime(value.strip(), "%Y-%m-%d")
+
+
+def parse_ticker_values(value):
+    """Form value "TCS:4.5,INFY:3.2" -> {"TCS": "4.5", "INFY": "3.2"}."""
+    pairs = {}
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        ticker, sep, rest = item.partition(":")
+        if not sep or not ticker.strip() or not rest.strip():
+            raise ValueError(f"expected TICKER:value, got {item.strip()!r}")
+        pairs[ticker.strip().upper()] = rest.strip()
+    return pairs
+
+
+def parse_implied_moves(value):
+    """Form value "TCS:4.5,INFY:3.2" -> {"TCS": 4.5, "INFY": 3.2}; moves must be positive and finite."""
+    implied = {}
+    for ticker, move in parse_ticker_values(value).items():
+        implied[ticker] = float(move)
+        if not math.isfinite(implied[ticker]) or implied[ticker] <= 0:
+            raise ValueError(f"implied move for {ticker} must be a positive number, got {move!r}")
+    return implied
+
+
+def parse_announcements(value):
+    """Form value "TCS:2025-10-09 16:30,INFY:2025-10-16" -> {ticker: (date, time or None)}."""
+    announcements = {}
+    for ticker, when in parse_ticker_values(value).items():
+        date, _, time = when.partition(" ")
+        parse_date(date)
+        if time:
+            datetime.strptime(time.strip(), "%H:%M")
+        announcements[ticker] = (date, time.strip() or None)
+    return announcements
+
+
+def expected_announcement(stored_dates, start, end):
+    """(date, time) a stored ticker is expected to report within [start, end], else None.
+
+    Each of the last four results is rolled forward in whole 52-week steps
+    to the first date on or after `start`; the earliest that lands by `end`
+    wins and keeps that quarter's announcement time.
+    """
+    latest = sorted(stored_dates, key=lambda pair: pair[0])[-4:]
+    best = None
+    for date, time in latest:
+        day = parse_date(date)
+        steps = max(1, math.ceil((start - day) / REPORTING_CYCLE))
+        candidate = day + steps * REPORTING_CYCLE
+        if candidate <= end and (best is None or candidate < best[0]):
+            best = (candidate, time)
+    if best is None:
+        return None
+    return best[0].strftime("%Y-%m-%d"), best[1]
+
+
+def screen_row(ticker, date, time, date_source, analysis, implied_move=None, baseline="full"):
+    """One ranked-table row: historical reaction stats next to the implied move."""
+    stats = analysis["stats"]
+    moves = [row["price_change_pct"] for row in analysis["results"] if row["price_change_pct"] is not None]
+    historical = {
+        "full": stats["absolute_mean"],
+        "rolling": stats["rolling"]["absolute_mean"],
+        "ewma": stats["ewma"]["absolute_mean"],
+    }[baseline]
+    row = {
+        "ticker": ticker,
+        "date": date,
+        "time": time,
+        "date_source": date_source,
+        "events": len(moves),
+        "absolute_mean": stats["absolute_mean"],
+        "first_std": stats["first_std"],
+        "rolling_absolute_mean": stats["rolling"]["absolute_mean"],
+        "rolling_first_std": stats["rolling"]["first_std"],
+        "ewma_absolute_mean": stats["ewma"]["absolute_mean"],
+        "ewma_first_std": stats["ewma"]["first_std"],
+        "last_move_pct": moves[-1] if moves else None,
+        "historical_move": historical,
+        "implied_move": implied_move,
+        "implied_to_historical": None,
+        "exceeded_implied_rate": None,
+    }
+    if implied_move is not None:
+        if historical:
+            row["implied_to_historical"] = round(implied_move / historical, 2)
+        if moves:
+            # How often the stock actually moved more than the straddle prices in
+            row["exceeded_implied_rate"] = round(sum(abs(m) > implied_move for m in moves) / len(moves), 2)
+    return row
+
+
+def rank_rows(rows):
+    """Cheapest straddles first (lowest implied/historical); rows without an implied move follow by biggest historical move."""
+    def key(row):
+        if row["implied_to_historical"] is not None:
+            return (0, row["implied_to_historical"])
+        return (1, -(row["historical_move"] if row["historical_move"] is not None else -math.inf))
+    ranked = sorted(rows, key=key)
+    for rank, row in enumerate(ranked, 1):
+        row["rank"] = rank
+    return ranked
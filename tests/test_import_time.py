@@ -0,0 +1,6 @@
+from benchmarks.import_time import check_import
+
+
+def test_app_imports_within_budget_without_heavy_modules():
+    _, _, failures = check_import("app")
+    assert not failures, "; ".join(failures)
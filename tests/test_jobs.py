@@ -0,0 +1,34 @@
+import threading
+import time
+
+import pytest
+
+from jobs import DONE, RUNNING, JobQueue, JobQueueFull
+
+
+def wait_for(queue, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while queue.get(job_id)["status"] != status:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_submissions_past_the_queued_cap_are_refused():
+    queue = JobQueue(max_workers=1, max_queued=2)
+    release = threading.Event()
+    try:
+        running, _ = queue.submit("running", lambda progress: release.wait())
+        wait_for(queue, running["job_id"], RUNNING)
+        queue.submit("a", lambda progress: None)
+        waiting, _ = queue.submit("b", lambda progress: None)
+        with pytest.raises(JobQueueFull):
+            queue.submit("c", lambda progress: None)
+        # A resubmitted key that is already waiting is still deduplicated
+        assert queue.submit("a", lambda progress: None)[1]
+        release.set()
+        wait_for(queue, waiting["job_id"], DONE)
+        job, _ = queue.submit("c", lambda progress: None)
+        wait_for(queue, job["job_id"], DONE)
+    finally:
+        release.set()
+        queue.shutdown()
@@ -0,0 +1,63 @@
+import pytest
+
+from ocr_layout import events_from_words
+from ocr_parser import extract_dates_times_from_text
+
+PARSER_CASES = [
+    ("rows", "18 Jul 2025 19:33\n17 Apr 2025 16:05",
+     [("2025-07-18", "19:33"), ("2025-04-17", "16:05")]),
+    ("column blocks", "Date\n18 Jul 2025\n17 Apr 2025\nTime\n19:33\n16:05",
+     [("2025-07-18", "19:33"), ("2025-04-17", "16:05")]),
+    ("missing time in the middle", "18 Jul 2025 19:33\n17 Apr 2025\n16 Jan 2025 15:45",
+     [("2025-07-18", "19:33"), ("2025-04-17", None), ("2025-01-16", "15:45")]),
+    ("day-first numeric", "05/07/2025 18:00\n13.01.2025 16:30",
+     [("2025-07-05", "18:00"), ("2025-01-13", "16:30")]),
+    ("month-first numeric when the day can't be second", "07/13/2025 18:00",
+     [("2025-07-13", "18:00")]),
+    ("am/pm times", "Jul 18, 2025 7:33 pm\nApr 17, 2025 12:05 a.m.\nJan 16, 2025 12:30PM",
+     [("2025-07-18", "19:33"), ("2025-04-17", "00:05"), ("2025-01-16", "12:30")]),
+    ("ISO timestamps", "2025-07-18T19:33\n2025-04-17 16:05:00",
+     [("2025-07-18", "19:33"), ("2025-04-17", "16:05")]),
+    ("invalid dates and times dropped", "31/02/2025 25:00\n18 Jul 2025 19:33",
+     [("2025-07-18", "19:33")]),
+]
+
+
+@pytest.mark.parametrize("text, expected", [case[1:] for case in PARSER_CASES],
+                         ids=[case[0] for case in PARSER_CASES])
+def test_parser_layouts(text, expected):
+    assert extract_dates_times_from_text(text) == expected
+
+
+def words(top, *cells):
+    """Word boxes for one visual row; each cell is (left, text), split into words 10px per character."""
+    boxes = []
+    for left, text in cells:
+        for word in text.split():
+            boxes.append((word, left, top, 10 * len(word), 20))
+            left += 10 * (len(word) + 1)
+    return boxes
+
+
+LAYOUT_CASES = [
+    ("rows", words(0, (0, "18 Jul 2025"), (200, "19:33")) + words(40, (0, "17 Apr 2025"), (200, "16:05")),
+     [("2025-07-18", "19:33"), ("2025-04-17", "16:05")]),
+    ("side-by-side tables",
+     words(0, (0, "18 Jul 2025"), (200, "19:33"), (400, "17 Jul 2024"), (600, "18:10"))
+     + words(40, (0, "17 Apr 2025"), (200, "16:05"), (400, "18 Apr 2024"), (600, "15:50")),
+     [("2025-07-18", "19:33"), ("2024-07-17", "18:10"), ("2025-04-17", "16:05"), ("2024-04-18", "15:50")]),
+    ("time under its date", words(0, (0, "18 Jul 2025")) + words(25, (20, "19:33")),
+     [("2025-07-18", "19:33")]),
+    ("missing time in the middle",
+     words(0, (0, "18 Jul 2025"), (200, "19:33")) + words(40, (0, "17 Apr 2025"))
+     + words(80, (0, "16 Jan 2025"), (200, "15:45")),
+     [("2025-07-18", "19:33"), ("2025-04-17", None), ("2025-01-16", "15:45")]),
+    ("day-first numeric and am/pm", words(0, (0, "05/07/2025"), (200, "7:33 pm")),
+     [("2025-07-05", "19:33")]),
+]
+
+
+@pytest.mark.parametrize("boxes, expected", [case[1:] for case in LAYOUT_CASES],
+                         ids=[case[0] for case in LAYOUT_CASES])
+def test_layout_pairing(boxes, expected):
+    assert [(event["date"], event["time"]) for event in events_from_words(boxes)] == expected
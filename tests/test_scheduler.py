@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from scheduler import IST, PrewarmScheduler
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def run_until(clock, scheduler, end, step=timedelta(minutes=15)):
+    while clock.now < end:
+        clock.now += step
+        scheduler.tick()
+
+
+def make_scheduler(start, ticker):
+    clock = FakeClock(start)
+    calls = []
+    scheduler = PrewarmScheduler(
+        clock=clock,
+        refresh=lambda t, today: calls.append(("refresh", t, clock.now)),
+        recompute=lambda t: calls.append(("recompute", t, clock.now)),
+        tickers=lambda: [ticker],
+        prewarm_on_start=False,
+    )
+    scheduler.tick()
+    return clock, scheduler, calls
+
+
+def test_next_prewarm_time_skips_the_weekend():
+    scheduler = PrewarmScheduler(clock=lambda: datetime(2025, 7, 18, 10, 0, tzinfo=IST), prewarm_on_start=False)
+    assert scheduler.next_prewarm_time(datetime(2025, 7, 18, 10, 0, tzinfo=IST)) == \
+        datetime(2025, 7, 21, 8, 45, tzinfo=IST)
+
+
+def test_after_hours_result_refreshes_after_next_session_closes():
+    # TCS reported Thursday 2025-07-10 at 16:01, so Friday's session is the reaction
+    clock, scheduler, calls = make_scheduler(datetime(2025, 7, 10, 16, 0, tzinfo=IST), "TCS")
+    run_until(clock, scheduler, datetime(2025, 7, 11, 16, 0, tzinfo=IST))
+    refreshes = [when for kind, _, when in calls if kind == "refresh" and when.hour >= 15]
+    assert refreshes == [datetime(2025, 7, 11, 15, 30, tzinfo=IST)]
+    assert ("recompute", "TCS", datetime(2025, 7, 11, 15, 30, tzinfo=IST)) in calls
+
+
+def test_friday_evening_result_waits_for_monday_close():
+    # RELIANCE reported Friday 2025-07-18 at 19:33; the reaction bar is Monday's
+    clock, scheduler, calls = make_scheduler(datetime(2025, 7, 18, 19, 0, tzinfo=IST), "RELIANCE")
+    run_until(clock, scheduler, datetime(2025, 7, 21, 16, 0, tzinfo=IST))
+    assert not [when for _, _, when in calls if when.weekday() >= 5]
+    post_close = [when for kind, _, when in calls if kind == "refresh" and when.hour >= 15]
+    assert post_close == [datetime(2025, 7, 21, 15, 30, tzinfo=IST)]
@@ -0,0 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import earnings_dates
+from earnings_reaction_calculator import price_changes_for_dates
+
+
+def test_parallel_price_changes_match_serial(monkeypatch):
+    # /screen analyses tickers on a thread pool; results must not bleed between calls
+    monkeypatch.setenv("PRICE_PROVIDER", "synthetic")
+    tickers = earnings_dates.stored_tickers()
+    serial = {t: price_changes_for_dates(t, getattr(earnings_dates, t)) for t in tickers}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        parallel = list(pool.map(lambda t: (t, price_changes_for_dates(t, getattr(earnings_dates, t))), tickers * 5))
+    assert all(results == serial[t] for t, results in parallel)
+
+
+def test_screen_with_cold_cache_matches_serial_analyses(monkeypatch):
+    monkeypatch.setenv("PRICE_PROVIDER", "synthetic")
+    import app
+
+    monkeypatch.setattr(app, "stored_analyses", {})
+    tickers = earnings_dates.stored_tickers()
+    screened = app.screen_analyses(tickers)
+    for ticker in tickers:
+        assert screened[ticker]["stats"] == app.build_analysis(ticker, getattr(earnings_dates, ticker))["stats"]
@@ -0,0 +1,186 @@
+import io
+import json
+
+import numpy as np
+
+# Per-file and per-request upload limits
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+MAX_REQUEST_BYTES = 40 * 1024 * 1024
+MAX_IMAGES = 8
+READ_CHUNK_BYTES = 1024 * 1024
+
+# Screenshots above this many pixels are decoded at 1/2, 1/4 or 1/8 scale;
+# earnings tables stay legible to OCR well below it
+MAX_OCR_PIXELS = 12_000_000
+# Only JPEGs are scaled while decoding, so only they may be bigger than a
+# full decode we can afford; PIL's own decompression-bomb check (~179 MP)
+# still applies on top
+MAX_SOURCE_PIXELS = 12 * MAX_OCR_PIXELS
+MAX_DECODE_PIXELS = 4 * MAX_OCR_PIXELS
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload goes over one of the ingest limits."""
+
+
+class InvalidImage(Exception):
+    """Raised when an upload isn't an image format we can decode."""
+
+
+class BodySizeLimitMiddleware:
+    """ASGI middleware that rejects request bodies over `max_bytes` with a 413.
+
+    A declared Content-Length over the limit is refused before any of the
+    body is read. Otherwise the body is counted as it streams in, and the
+    request is cut off as soon as it passes the limit, so an oversized
+    upload is never buffered or spooled in full.
+    """
+
+    def __init__(self, app, max_bytes=MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Stop reading here; the app sees the client go away
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded and not response_started:
+                # Drop the app's reply to the truncated body; the 413 goes out below
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded or response_started:
+                raise
+        if exceeded and not response_started:
+            await self._reject(send)
+
+    async def _reject(self, send):
+        body = json.dumps({"error": f"Request body exceeds {self.max_bytes} bytes."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+async def read_upload(upload, max_bytes=MAX_UPLOAD_BYTES, chunk_size=READ_CHUNK_BYTES):
+    """Read an UploadFile in chunks, raising UploadTooLarge as soon as it passes `max_bytes`."""
+    size = getattr(upload, "size", None)
+    if size is not None and size > max_bytes:
+        raise UploadTooLarge(f"{upload.filename} is larger than {max_bytes} bytes.")
+    buffer = bytearray()
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise UploadTooLarge(f"{upload.filename} is larger than {max_bytes} bytes.")
+    return bytes(buffer)
+
+
+async def read_uploads(uploads, max_images=MAX_IMAGES, max_bytes=MAX_UPLOAD_BYTES):
+    if len(uploads) > max_images:
+        raise UploadTooLarge(f"At most {max_images} images can be uploaded per request.")
+    return [await read_upload(upload, max_bytes) for upload in uploads]
+
+
+def _open_image(contents):
+    """PIL image over `contents`, header only until pixels are used."""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        return Image.open(io.BytesIO(contents))
+    except Image.DecompressionBombError as e:
+        raise UploadTooLarge("Image is too large to process.") from e
+    except UnidentifiedImageError as e:
+        raise InvalidImage("Upload is not a supported image file.") from e
+
+
+def image_header(contents):
+    """(width, height, format) read from the image header only, without decoding pixels."""
+    with _open_image(contents) as img:
+        return img.width, img.height, img.format
+
+
+def reduction_factor(width, height, image_format, max_pixels=MAX_OCR_PIXELS):
+    """Smallest of 1, 2, 4, 8 that brings width*height under `max_pixels`.
+
+    Only JPEGs are scaled while decoding; every other format is decoded at
+    full size first, so those are refused past MAX_DECODE_PIXELS.
+    """
+    limit = MAX_SOURCE_PIXELS if image_format == "JPEG" else MAX_DECODE_PIXELS
+    if width * height > limit:
+        raise UploadTooLarge(f"Image is {width}x{height}, too large to process.")
+    for factor in (1, 2, 4, 8):
+        if (width // factor) * (height // factor) <= max_pixels:
+            return factor
+    return 8
+
+
+def decode_image_bounded(contents, max_pixels=MAX_OCR_PIXELS):
+    """Decode to a BGR array with OpenCV, at reduced resolution when the image is bigger than OCR needs.
+
+    JPEGs are scaled during decoding (IMREAD_REDUCED_COLOR_*), so the
+    full-resolution bitmap is never allocated.
+    """
+    import cv2
+
+    width, height, image_format = image_header(contents)
+    factor = reduction_factor(width, height, image_format, max_pixels)
+    flags = {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+    }[factor]
+    img = cv2.imdecode(np.frombuffer(contents, np.uint8), flags)
+    if img is None:
+        # Header parsed but the pixel data didn't (truncated or corrupt file)
+        raise InvalidImage("Upload could not be decoded as an image.")
+    return img
+
+
+def open_image_bounded(contents, max_pixels=MAX_OCR_PIXELS):
+    """Open with PIL, using JPEG draft mode and reduce() to stay under `max_pixels`."""
+    img = _open_image(contents)
+    width = img.width
+    factor = reduction_factor(img.width, img.height, img.format, max_pixels)
+    if factor > 1:
+        # draft() scales JPEGs while decoding; other formats are reduced after
+        img.draft("RGB", (img.width // factor, img.height // factor))
+        remaining = round(factor * img.width / width)
+        if remaining > 1:
+            img = img.reduce(remaining)
+    return img.convert("RGB")